@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+version: python 3.8
+run_benchmarks.py times the algorithms on the datasets and appends the
+    results to a csv-file, so performance can be compared between versions,
+    areas named Synthetic<n> are generated with n stations in output/ when
+    missing
+
+    run from the root of the repository with:
+        python3 -m benchmarks.run_benchmarks [options]
+
+methods:
+    main                - runs all benchmarks for the given options;
+    print_help          - prints the options of the benchmarks;
+    measure             - times a function and measures its peak memory;
+    version             - returns the current git commit;
+    benchmark_algorithm - benchmarks one of the line creating algorithms;
+    benchmark_astar     - benchmarks A_Star.create_line;
+    write_results       - appends the results to the csv-file;
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import os
+import sys
+import csv
+import math
+import time
+import random
+import subprocess
+import tracemalloc
+
+from code.data_loader.load_data import load
+from code.data_loader.generate_data import generate, save
+from code.algorithms import Random_Connections, Greedy, Hill_Climber, \
+                            Simulated_Annealing, A_Star
+from code.classes import Arg
+
+# max duration and max number of lines per area
+AREAS = {"Holland": (120, 7), "Nationaal": (180, 20)}
+
+# algorithms to benchmark and if they take iterations
+ALGORITHMS = {"random": (Random_Connections, False),
+              "greedy": (Greedy, False),
+              "hill_climber": (Hill_Climber, True),
+              "simulated_annealing": (Simulated_Annealing, True)}
+
+# columns of the results file
+FIELDS = ["version", "date", "area", "stations", "connections", "algorithm",
+          "repeat", "iterations", "steps", "setup_s", "run_s", "steps_per_s",
+          "peak_mb", "best_K", "time_limit", "scheduler"]
+
+
+def main(argv):
+    """
+    run all benchmarks for the given options
+    """
+
+    # define commandline arguments
+    arguments = [Arg(("-h", "--help"), "Prints this message", True),
+                 Arg(("-a", "--areas"), "Comma separated areas, "
+                     "Synthetic<n> for n stations (default Holland,"
+                     "Nationaal)", True),
+                 Arg(("-A", "--algorithms"), "Comma separated algorithms "
+                     "(default all and astar)", True),
+                 Arg(("-r", "--repeat"), "No. of repetitions (default 10)",
+                     True, "int"),
+                 Arg(("-i", "--iterations"), "No. of iterations per run "
+                     "(default 1000)", True, "int"),
+                 Arg(("-t", "--time"), "No. of seconds per run of the "
+                     "hill climbers instead of iterations, unseeded so the "
+                     "operators are chosen by their improvement per second",
+                     True, "float"),
+                 Arg(("-s", "--scheduler"), "Operator scheduler of the hill "
+                     "climbers, adaptive or uniform (default adaptive)",
+                     True),
+                 Arg(("-p", "--pairs"), "No. of station pairs for astar "
+                     "(default 100)", True, "int"),
+                 Arg(("-S", "--seed"), "Seed of the benchmarks (default 0)",
+                     True, "int"),
+                 Arg(("-o", "--output"), "CSV file to append results to "
+                     "(default output/benchmarks.csv)", True)]
+
+    # print help function if help parameters are present
+    if "-h" in argv or "--help" in argv:
+        print_help(arguments)
+
+    # add all argument aliases to argument_options
+    argument_options = ()
+    for argument in arguments:
+        argument_options += argument.aliases
+
+    # predefine user_input dictionary with the defaults
+    user_input = {"areas": ",".join(AREAS),
+                  "algorithms": ",".join(list(ALGORITHMS) + ["astar"]),
+                  "repeat": 10, "iterations": 1000, "time": None,
+                  "scheduler": "adaptive", "pairs": 100, "seed": 0,
+                  "output": "output/benchmarks.csv"}
+
+    # add the given values to user_input
+    for arg in arguments:
+        for index in range(0, len(argv) - 1, 2):
+            if argv[index] in arg.aliases and \
+                    argv[index + 1] not in argument_options:
+                arg.value = argv[index + 1]
+                user_input[arg.name] = arg.value
+            elif argv[index + 1] in argument_options:
+                print_help(arguments)
+
+    # run the benchmarks for each area
+    results = []
+    for area in user_input["areas"].split(","):
+
+        # generate synthetic areas with the seed of the benchmarks, they're
+        #   kept in output/ so data/ only holds the real areas
+        directory = "output" if area.startswith("Synthetic") else "data"
+        stations_file = f"{directory}/Stations{area}.csv"
+        connections_file = f"{directory}/Connecties{area}.csv"
+        if area.startswith("Synthetic") and \
+                not os.path.isfile(stations_file):
+            save(generate(area[len("Synthetic"):], user_input["seed"]),
+                 stations_file, connections_file)
+
+        # make sure the area can be loaded
+        if not os.path.isfile(stations_file):
+            exit(f"BenchmarkError: please make sure {stations_file} exists")
+
+        stations, connections = load(stations_file, connections_file)
+
+        # other areas get enough lines to cover all connections
+        max_duration, max_n_of_l = AREAS.get(area, AREAS["Nationaal"])
+        max_n_of_l = max(max_n_of_l, math.ceil(sum(
+            connection.duration for connection in connections) /
+            max_duration))
+
+        # the data of this area in the results
+        data = {"area": area, "stations": len(stations),
+                "connections": len(connections)}
+
+        # run each algorithm
+        for name in user_input["algorithms"].split(","):
+            if name == "astar":
+                result = benchmark_astar(stations, connections, max_duration,
+                                         user_input["pairs"],
+                                         user_input["seed"])
+            elif name in ALGORITHMS:
+                result = benchmark_algorithm(name, connections, max_duration,
+                                             max_n_of_l, user_input["repeat"],
+                                             user_input["iterations"],
+                                             user_input["seed"],
+                                             user_input["time"],
+                                             user_input["scheduler"])
+            else:
+                exit(f"BenchmarkError: algorithm should be one of "
+                     f"{', '.join(list(ALGORITHMS) + ['astar'])}")
+
+            result.update(data)
+            results.append(result)
+
+            # print the result of this benchmark
+            print(f"{area:<12} {name:<20} {result['steps_per_s']:>12.1f} "
+                  f"steps/s {result['peak_mb']:>8.2f} MB  K "
+                  f"{result['best_K']}")
+
+    # save the results
+    write_results(results, user_input["output"])
+
+
+def print_help(arguments):
+    """
+    print help function
+
+    parameters:
+        arguments - arguments to be printed
+    """
+
+    # print usage
+    print("usage python3 -m benchmarks.run_benchmarks [options]\n")
+
+    print("optional options:")
+
+    # print optional options
+    for argument in arguments:
+        print(argument)
+
+    print()
+
+    # exit
+    exit()
+
+
+def measure(function, *args, **kwargs):
+    """
+    times a function and measures its peak memory, the function is run once
+        for the time and once under tracemalloc for the memory, so tracing
+        doesn't slow down the timing
+
+    parameters:
+        function    - function to measure, should be deterministic;
+        args        - arguments of the function;
+        kwargs      - keyword arguments of the function;
+
+    returns the result of the function, seconds and peak memory in MB
+    """
+
+    # time the function
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    duration = time.perf_counter() - start
+
+    # measure the peak memory of the function
+    tracemalloc.start()
+    function(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, duration, peak / 2**20
+
+
+def version():
+    """
+    returns the current git commit, or an empty string outside git
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def benchmark_algorithm(name, connections, max_duration, max_n_of_l, repeat,
+                        iterations, seed, time_limit=None,
+                        scheduler="adaptive"):
+    """
+    benchmarks one of the line creating algorithms, a step is one scored
+        solution (random and greedy) or one iteration (hill climbers), with
+        a time limit the hill climbers run unseeded so their operators are
+        chosen by the improvement per second
+
+    parameters:
+        name            - name of the algorithm;
+        connections     - connections in database;
+        max_duration    - max duration for the lines;
+        max_n_of_l      - max number of lines;
+        repeat          - number of repeats;
+        iterations      - number of iterations per repeat;
+        seed            - seed of the algorithm;
+        time_limit      - no. of seconds per run of the hill climbers
+                            instead of iterations (default None);
+        scheduler       - operator scheduler of the hill climbers, adaptive
+                            or uniform (default adaptive);
+
+    returns dictionary with the result
+    """
+
+    # make sure the scheduler exists
+    if scheduler not in ["adaptive", "uniform"]:
+        exit("BenchmarkError: please make sure the scheduler is adaptive or "
+             "uniform")
+
+    algorithm, iterative = ALGORITHMS[name]
+    timed = iterative and time_limit is not None
+
+    # run a new instance with the same seed each time, the set up (the hill
+    #   climbers make their start state here) and the run are timed apart
+    def run():
+        start = time.perf_counter()
+        if timed:
+            instance = algorithm(connections, max_duration, max_n_of_l,
+                                 time_limit=time_limit * repeat)
+        else:
+            instance = algorithm(connections, max_duration, max_n_of_l,
+                                 seed=seed)
+        setup = time.perf_counter() - start
+
+        # choose every operator as often, to compare with the scheduler
+        if iterative and scheduler == "uniform":
+            instance.scheduler.min_probability = \
+                1 / len(instance.scheduler.operators)
+
+        start = time.perf_counter()
+        if timed:
+            result = instance.run(repeat, None, progress_bar=False)
+        elif iterative:
+            result = instance.run(repeat, iterations, progress_bar=False)
+        else:
+            result = instance.run(repeat, progress_bar=False)
+        duration = time.perf_counter() - start
+
+        return instance, result, setup, duration
+
+    (instance, result, setup, duration), _, peak = measure(run)
+
+    # count the iterations, or the solutions scored by random and greedy,
+    #   the iterations within a time limit are in the traces of the runs
+    if timed:
+        steps = sum(len(trace["iterations"])
+                    for trace in instance.scores.values()
+                    if "iterations" in trace)
+    elif iterative:
+        steps = repeat * iterations
+    else:
+        steps = sum(len(trace["scores"])
+                    for trace in instance.scores.values())
+
+    return {"algorithm": name, "repeat": repeat,
+            "iterations": iterations if iterative and not timed else "",
+            "time_limit": time_limit if timed else "",
+            "scheduler": scheduler if iterative else "", "steps": steps,
+            "setup_s": setup, "run_s": duration,
+            "steps_per_s": steps / duration, "peak_mb": peak,
+            "best_K": result[0][1]}
+
+
+def benchmark_astar(stations, connections, max_duration, pairs, seed):
+    """
+    benchmarks A_Star.create_line between random pairs of stations, a step
+        is one created line
+
+    parameters:
+        stations        - stations in database;
+        connections     - connections in database;
+        max_duration    - max duration for the lines;
+        pairs           - number of station pairs;
+        seed            - seed to choose the pairs;
+
+    returns dictionary with the result
+    """
+
+    # choose the station pairs
+    rng = random.Random(seed)
+    stations = list(stations.values())
+    station_pairs = [(rng.choice(stations), rng.choice(stations))
+                     for _ in range(pairs)]
+
+    # set up the algorithm (the distance matrix is computed here)
+    astar, setup, _ = measure(A_Star, connections, max_duration)
+
+    # create the lines between all pairs
+    def run():
+        return [astar.create_line(*pair) for pair in station_pairs]
+
+    _, duration, peak = measure(run)
+    duration = max(duration, 1e-9)
+
+    return {"algorithm": "astar", "repeat": pairs, "iterations": "",
+            "steps": pairs, "setup_s": setup, "run_s": duration,
+            "steps_per_s": pairs / duration, "peak_mb": peak, "best_K": ""}
+
+
+def write_results(results, output_file):
+    """
+    appends the results to the csv-file, the header is written only to a
+        new file
+
+    parameters:
+        results     - list of result dictionaries;
+        output_file - csv file to append the results to;
+    """
+
+    # add the version and date to every result
+    commit = version()
+    date = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    new_file = not os.path.isfile(output_file)
+    with open(output_file, "a", newline="") as results_file:
+        writer = csv.DictWriter(results_file, fieldnames=FIELDS)
+
+        if new_file:
+            writer.writeheader()
+
+        for result in results:
+            writer.writerow(dict(result, version=commit, date=date))
+
+    print(f"results written to {output_file}")
+
+
+# if name is main run main()
+if __name__ == "__main__":
+    main(sys.argv[1:])
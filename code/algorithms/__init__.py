@@ -1,5 +1,8 @@
 from .random import Random_Connections
 from .greedy import Greedy
 from .astar import A_Star
+from .shortest_paths import Shortest_Paths
 from .hill_climber import Hill_Climber
 from .simulated_annealing import Simulated_Annealing
+from .multi_start import Multi_Start
+from .parallel_tempering import Parallel_Tempering
@@ -7,9 +7,13 @@ authors:
     Michael Faber, 6087582
 """
 
-from geopy import distance
+import heapq
+import numpy as np
+
+from collections import defaultdict
 
 from code.classes import Line
+from code.data_loader.distances import pair_distances, station_distances
 
 
 class A_Star():
@@ -21,25 +25,25 @@ class A_Star():
         connections         - all connections that can be used in a line;
         max_duration        - maximal duration of the line in minutes;
         result              - result or list of results of the algorithm;
-        choices             - dictionary containing all starting points;
-        number_of_results   - number of results that will be returned;
+        number_of_results   - number of results that will be returned
+                                (the k shortest lines);
+        method              - distance method, haversine or geodesic;
+        distance_file       - .npz file to cache the distances in;
         speed               - minimal time in minutes per km;
 
     property:
         result              - returns result or list of results;
 
     methods:
-        update_result       - updates result according to number_of_results;
         time_per_km         - returns lowest duration divided by distance;
         station_distance    - returns distance between two stations in km;
-        copy_connections    - copies connections from one line to another;
-        choose_best_option  - returns best option for chosen method;
-        add_choice          - adds choice to choices;
-        new_line            - creates new line and adds to choices;
+        heuristic           - returns minimal duration between two stations;
+        build_line          - builds a line from the search tree;
         create_line         - returns shortest line(s) between two stations;
     """
 
-    def __init__(self, connections, max_duration, number_of_results=1):
+    def __init__(self, connections, max_duration, number_of_results=1,
+                 method="haversine", distance_file=None):
         """
         initialize A_Star
 
@@ -47,13 +51,32 @@ class A_Star():
             connections         - all connections that can be used in a line;
             max_duration        - maximal duration of the line in minutes;
             number_of_results   - number of results that will be returned;
+            method              - distance method, haversine or geodesic
+                (default haversine);
+            distance_file       - .npz file to cache the distances in
+                (default None);
         """
 
-        self._connections = connections
+        # make sure number_of_results is a positive integer
+        try:
+            number_of_results = int(number_of_results)
+            assert number_of_results > 0
+        except (AssertionError, ValueError):
+            exit("A_StarInitError: please make sure number_of_results is a "
+                 "positive integer")
+
+        self._connections = {connection.cid: connection
+                             for connection in connections}
         self._max_duration = max_duration
         self._result = []
-        self._choices = dict()
         self._number_of_results = number_of_results
+
+        # the distances to a station are computed when it's first a goal,
+        #   shared per graph
+        self._graph = connections[0].graph
+        self._method = method
+        self._distance_file = distance_file
+
         self._speed = self.time_per_km()
 
     @property
@@ -72,50 +95,26 @@ class A_Star():
 
         self._result = value
 
-    def update_result(self, best_option):
-        """
-        Update result according the maximum number of results
-
-        parameters:
-            best_option    - line that is best option from A to B;
-        """
-
-        if self._number_of_results == 1:
-            self.result = best_option
-
-        else:
-
-            # Add best line to results for number_of_results times
-            self._result.append(best_option)
-
     def time_per_km(self):
         """
         Returns the fastest time a train in connections does over 1 km.
         """
 
-        # Create empty list for time per km for every connection
-        minutes_per_km_list = []
-
-        # For every connection set station 1 and 2
-        for connection in self._connections:
+        # get the distance between the stations of every connection
+        distances = pair_distances(self._graph, self._graph.starts,
+                                   self._graph.ends, self._method)
 
-            station1 = connection.section[0]
-            station2 = connection.section[1]
+        # Calculate minutes per km by dividing the time of the connection
+        #   by the distance between stations, skip stations at the same spot
+        minutes_per_km = self._graph.durations[distances > 0] / \
+            distances[distances > 0]
 
-            # Calculate minutes per km by dividing the time of
-            # the connection by the distance between stations
-            minutes_per_km = connection.duration / self.station_distance(
-                             station1, station2)
-
-            # Add to list
-            minutes_per_km_list.append(minutes_per_km)
-
-        # return lowest value in list
-        return min(minutes_per_km_list)
+        # return lowest value
+        return float(np.min(minutes_per_km))
 
     def station_distance(self, station1, station2):
         """
-        Calculate distance between two stations using geopy
+        Look up distance between two stations in the distances to station2
 
         parameters:
             station1    - station of Station class;
@@ -124,171 +123,128 @@ class A_Star():
         returns distance in kilometer
         """
 
-        return distance.distance(station1.position, station2.position).km
+        return float(station_distances(self._graph, station2.sid,
+                                       self._method,
+                                       self._distance_file)[station1.sid])
 
-    def copy_connections(self, new_line, old_line):
+    def heuristic(self, station1, station2):
         """
-        Copy all connections from one line to the other
+        Returns the minimal duration between two stations, the distance
+            at the fastest speed of all connections
 
         parameters:
-            new_line    - line where the connections will be added to;
-            old_line    - line where the connections will be copied from;
-        """
-
-        for old_connection in old_line.connections:
-            new_line.add_connection(old_connection,
-                                    self._max_duration)
-
-    def choose_best_option(self, method="min"):
-        """
-        returns best option for chosen method
-
-        parameter:
-            method  - method used (min, max, minconnections, maxconnections);
-
-        returns chosen line
+            station1    - station of Station class;
+            station2    - station of Station class;
         """
 
-        # If method is min, return min
-        if method == "min":
-            return min(self._choices, key=self._choices.get)
-
-        # If method is max, return max
-        elif method == "max":
-            return max(self._choices, key=self._choices.get)
-
-        # If method is minconnections, return min connections
-        elif method == "minconnections":
-            return min(self._choices, key=lambda x: len(x.connections))
-
-        # If method is maxconnections, return max connections
-        elif method == "maxconnections":
-            return max(self._choices, key=lambda x: len(x.connections))
-
-        # If other method is specified, print error
-        else:
-            print("Give a valid method")
+        return self.station_distance(station1, station2) * self._speed
 
-    def add_choice(self, line, station2):
+    def build_line(self, station1, tree, node):
         """
-        Calculates penalty time and adds line to choices
+        Builds a line from the search tree
 
         parameters:
-            line        - line that will be added to choices
-            station2    - the end station where the line needs to go to
-        """
-
-        # Add minimal duration to get to station2
-        line.penalty = self.station_distance(
-                        line.stations[-1], station2) * self._speed
-
-        # Add line to choices with sum of duration and
-        # minimal duration if less than max duration
-        if line.duration + line.penalty <= self._max_duration:
-            self._choices[line] = line.duration + line.penalty
-
-    def new_line(self, connection, line, best_option, station2):
-        """
-        Creates copy of best_option, add new connection and add to choices
+            station1    - station where the line starts;
+            tree        - search tree, list of (connection id, parent node);
+            node        - node in the tree where the line ends;
 
-        parameters:
-            connection  - connection that is going to be added;
-            line        - line that will be updated;
-            best_option - old line that will be copied;
-            station2    - end station line is going to;
+        returns the line
         """
 
-        # If there are connections in best_option
-        if best_option.connections:
-
-            # If connection is not same as last connection of best option
-            if connection != best_option.connections[-1]:
-
-                # Copy all connections from best_option to line
-                self.copy_connections(line, best_option)
+        # walk back to the root of the tree to find the connections
+        cids = []
+        while node is not None:
+            cid, node = tree[node]
+            cids.append(cid)
 
-                # Add new connection
-                if not line.add_connection(connection, self._max_duration):
-                    return
+        # add the connections from the start, the root has no connection
+        line = Line(station1)
+        for cid in reversed(cids[:-1]):
+            line.add_connection(self._connections[cid], self._max_duration)
 
-                # Add line to choices
-                self.add_choice(line, station2)
-
-        else:
-
-            # Add new connection
-            if not line.add_connection(connection, self._max_duration):
-                return
-
-            # Add line to choices
-            self.add_choice(line, station2)
+        return line
 
     def create_line(self, station1, station2):
         """
         Returns line(s) between two stations with the shortest duration
-            using the A* algorithm
+            using the A* algorithm, the open list is a priority queue on
+            duration + heuristic and each station is closed after it has
+            been expanded number_of_results times
 
         parameters:
             station1    - station where pathfinding starts;
             station2    - station where pathfinding is going to;
 
-        returns a single or list of lines between two stations
+        returns a single or list of lines between two stations,
+            None if no line is found
         """
 
+        # predefine the results
+        results = []
+
         # return line with station1 if both stations are equal
         if station1 == station2:
-            return Line(station1)
-
-        # Set counters
-        c = 0
-
-        # Set variables
-        self._choices = dict()
-        total_duration = self.station_distance(station1, station2) * \
-            self._speed
-
-        # If total_duration is shorter or equal to max_duration, run function
-        if total_duration <= self._max_duration:
-
-            # Create empty line with minimal duration
-            line = Line(station1)
-            self._choices[line] = total_duration
-
-            # While there are still choices
-            while self._choices:
-
-                # Choose the option with lowest corrected duration
-                best_option = self.choose_best_option("max")
-
-                # choose the last station from best_option
-                station = best_option.stations[-1]
-
-                # If the last station in the best line is the same as station2
-                if station == station2:
-                    self.update_result(best_option)
-
-                    # Add one to counter to get to desired number of results
-                    c += 1
-                    if c == self._number_of_results:
-                        break
-
-                else:
-
-                    # Create a new line for every connection of the station
-                    for connection in station.connections.values():
-                        line = Line(station1)
-
-                        self.new_line(connection[0], line, best_option,
-                                      station2)
-
-                # Delete the line used for calculations from options
-                del self._choices[best_option]
-
-        # Return result
-        try:
-            type(self.result) is Line
-        except TypeError:
-            if len(self.result) == 0:
-                return None
+            results.append(Line(station1))
+
+        # keep the heuristic per station and how often it is expanded, the
+        #   heuristics come from the distances to station2
+        distances = station_distances(self._graph, station2.sid, self._method,
+                                      self._distance_file)
+        heuristics = dict()
+        expanded = defaultdict(int)
+
+        # the search tree holds (connection id, parent node) per node
+        tree = [(None, None)]
+
+        # the open list holds (f, node, g, station) with f = g + h
+        total_duration = self.heuristic(station1, station2)
+        open_list = [(total_duration, 0, 0., station1)]
+
+        # while there are still options and not enough results
+        while open_list and len(results) < self._number_of_results:
+
+            # choose the option with lowest corrected duration
+            _, node, duration, station = heapq.heappop(open_list)
+
+            # skip stations that have been closed
+            if expanded[station.sid] >= self._number_of_results:
+                continue
+            expanded[station.sid] += 1
+
+            # add a line to the results if it reached station2
+            if station == station2 and node != 0:
+                results.append(self.build_line(station1, tree, node))
+                continue
+
+            # add a new option for every connection of the station
+            for cid, (connection, next_station) in \
+                    station.connections.items():
+
+                # don't go back over the connection just used
+                if cid == tree[node][0]:
+                    continue
+
+                # skip stations that have been closed
+                if expanded[next_station.sid] >= self._number_of_results:
+                    continue
+
+                # find the minimal duration to get to station2
+                if next_station.sid not in heuristics:
+                    heuristics[next_station.sid] = \
+                        float(distances[next_station.sid]) * self._speed
+
+                # add option if it can be less than max duration
+                new_duration = duration + connection.duration
+                total_duration = new_duration + heuristics[next_station.sid]
+                if total_duration <= self._max_duration:
+                    tree.append((cid, node))
+                    heapq.heappush(open_list, (total_duration, len(tree) - 1,
+                                               new_duration, next_station))
+
+        # save and return the result(s)
+        if self._number_of_results == 1:
+            self.result = results[0] if results else None
+        else:
+            self.result = results if results else None
 
         return self.result
@@ -7,11 +7,9 @@ authors:
     Michael Faber, 6087582
 """
 
-import random as rd
-import copy
 import progressbar as pbar
 
-from code.classes import Line
+from code.classes import Line, Connection_Pool
 from code.algorithms import Random_Connections
 
 
@@ -33,36 +31,30 @@ class Greedy(Random_Connections):
        run                  - runs the algorithm a number of times
     """
 
-    def choose_start(self, connection_list):
+    def choose_start(self, connection_pool):
         """
         Returns random starting connection that has not been used
 
         parameter:
-            connection_list     - list of all connections that are not used
+            connection_pool     - pool of all connections that are not used
         """
 
-        # Choose random start connection
-        start_connection = rd.choice(self._connections)
+        # Choose random start connection from the unused connections
+        start_connection = connection_pool.choice(self._rng)
 
-        # While start connection is already used
-        while str(start_connection) not in connection_list:
+        # Delete chosen start connection from connection pool
+        connection_pool.remove(start_connection)
 
-            # Choose random start connection
-            start_connection = rd.choice(self._connections)
+        return start_connection, connection_pool
 
-        # Delete chosen start connection from connection list
-        connection_list.remove(str(start_connection))
-
-        return start_connection, connection_list
-
-    def choose_best_option(self, line, connection_list,
+    def choose_best_option(self, line, connection_pool,
                            method="min", one_time=True):
         """
         chooses best option according to different methods
 
         parameters:
             line                - line where best option must be chosen for;
-            connection_list     - list with all possible connections;
+            connection_pool     - pool with all possible connections;
             method              - method used to choose best option;
             one_time            - if a connection can be used one time;
 
@@ -74,8 +66,8 @@ class Greedy(Random_Connections):
 
         if one_time:
             # Get all options that have not been ridden
-            options = [option for option in options if str(option)
-                       in connection_list]
+            options = [option for option in options
+                       if option in connection_pool]
 
         if options:
 
@@ -101,15 +93,15 @@ class Greedy(Random_Connections):
 
         return False
 
-    def add_options(self, line, connection_list):
+    def add_options(self, line, connection_pool):
         """
         Add as much greedy options as possible to line
 
         parameters:
             line            - line with only start connection added;
-            connection_list - list with all possible connections;
+            connection_pool - pool with all possible connections;
 
-        returns line with new options and updated connection_list
+        returns line with new options and updated connection_pool
         """
 
         # While current + shortest duration is shorter than max duration
@@ -117,11 +109,11 @@ class Greedy(Random_Connections):
                key=lambda x: x[0].duration)[0].duration <= self._max_duration):
 
             # Choose the best option
-            best_option = self.choose_best_option(line, connection_list)
+            best_option = self.choose_best_option(line, connection_pool)
 
-            # If there is a best option delete from connection list
+            # If there is a best option delete from connection pool
             if best_option:
-                connection_list.remove(str(best_option))
+                connection_pool.remove(best_option)
 
             # If there are no best option stop the line
             else:
@@ -130,46 +122,47 @@ class Greedy(Random_Connections):
             # Add extra connection to line
             line.add_connection(best_option, self._max_duration)
 
-        return line, connection_list
+        return line, connection_pool
 
-    def create_line(self, connection_list):
+    def create_line(self, connection_pool):
         '''
         Creates a single line using greedy algorithm
 
         parameters:
-            connection_list - list of all connections that can be used;
+            connection_pool - pool of all connections that can be used;
 
-        returns completed line and connection_list for extra runs
+        returns completed line and connection_pool for extra runs
         '''
 
         # Set variables
         line = Line()
 
         # If there is a startpoint
-        if connection_list:
+        if connection_pool:
 
             # Add startpoint
-            start_connection, connection_list = \
-                    self.choose_start(connection_list)
+            start_connection, connection_pool = \
+                    self.choose_start(connection_pool)
 
             # Add first connection
             line.add_connection(start_connection, self._max_duration)
 
             # Add other connections
-            line, connection_list = self.add_options(line, connection_list)
+            line, connection_pool = self.add_options(line, connection_pool)
 
         # If there are no starting options return empty line
         else:
             line = []
 
-        return line, connection_list
+        return line, connection_pool
 
-    def run(self, repeat=1):
+    def run(self, repeat=1, progress_bar=True):
         """
         run this algorithm
 
         parameter:
-            repeat - number of repeats to do for this algorithm;
+            repeat          - number of repeats to do for this algorithm;
+            progress_bar    - do I need to show the progress? (default True);
 
         returns the result
         """
@@ -181,20 +174,27 @@ class Greedy(Random_Connections):
             exit("RunError: please make sure you've entered a number for "
                  "the number of repeats")
 
-        # print running parameters
-        print(f"Runing, Greedy {repeat} times")
+        # show progress bar
+        if progress_bar:
+
+            # print running parameters
+            print(f"Runing, Greedy {repeat} times")
+
+            # define the progress bar widgets
+            bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
 
-        # define the progress bar widgets
-        bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
+            # define the max value
+            maxval = repeat * (self._max_n_of_l - self._min_n_of_l + 1)
 
-        # define the max value
-        maxval = repeat * (self._max_n_of_l - self._min_n_of_l + 1)
+            # create the progress bar and start
+            bar = pbar.ProgressBar(maxval=maxval,
+                                   widgets=bar_widgets).start()
 
-        # create the progress bar and start
-        bar = pbar.ProgressBar(maxval=maxval, widgets=bar_widgets).start()
+            # initiate step to 0
+            step = 0
 
-        # initiate step to 0
-        step = 0
+        # start the clock
+        self.set_deadline(self._time_limit)
 
         # loop for each repeat
         for run in range(repeat):
@@ -204,14 +204,13 @@ class Greedy(Random_Connections):
                 # predefine lines list
                 lines = []
 
-                # create list of all connections
-                connection_list = [str(connection) for connection
-                                   in copy.deepcopy(self._connections)]
+                # create pool of all connections
+                connection_pool = Connection_Pool(self._connections)
 
                 # create current number of lines
                 for _ in range(n_of_l):
-                    line, connection_list = \
-                        self.create_line(connection_list)
+                    line, connection_pool = \
+                        self.create_line(connection_pool)
 
                     # check for empty values
                     if not line:
@@ -219,23 +218,32 @@ class Greedy(Random_Connections):
                     else:
                         lines.append(line)
 
-                # get score
+                # get score, the lines keep their duration and bitset
                 goal_function_result = self.goal_function(lines)
 
                 # add result to results attribute and save score
-                self._result.append((lines,) + goal_function_result)
-                self._scores[n_of_l]["runs"].append(run)
-                self._scores[n_of_l]["scores"].append(goal_function_result[0])
+                self._result.add((lines,) + goal_function_result)
+                self._scores.record(n_of_l, runs=run,
+                                    scores=goal_function_result[0])
 
                 # update progress bar
-                step += 1
-                bar.update(step)
+                if progress_bar:
+                    step += 1
 
-            # save the 5 best results
-            self._result = sorted(self._result, key=lambda x: x[1],
-                                  reverse=True)[:5]
+                    bar.update(step)
+
+                # stop with the solutions so far when out of time
+                if self.out_of_time():
+                    break
+
+            if self.out_of_time():
+                break
 
         # finish the progress bar
-        bar.finish()
+        if progress_bar:
+            bar.finish()
+
+        # write the streamed scores
+        self._scores.flush()
 
-        return self._result
+        return self._result.results
@@ -9,12 +9,14 @@ authors:
 
 
 # used imports
-import random as rd
-import copy
+import os
+import time
+import pickle
 import progressbar as pbar
 
-from code.algorithms import Random_Connections, A_Star
-from code.classes import Line
+from code.algorithms import Random_Connections, Greedy, Shortest_Paths
+from code.classes import Line, Score, Operator_Scheduler, Top_Results
+from code.data_loader.load_data import decode_lines, load_solution
 
 
 class Hill_Climber(Random_Connections):
@@ -26,8 +28,27 @@ class Hill_Climber(Random_Connections):
         connections     - connections in database;
         max_duration    - maximal duration for a line
         max_n_of_l      - maximal number of lines;
+        history_every   - keep one of every n scores in memory (default 1);
+        history_file    - csv file to stream all scores to (default None);
+        seed            - seed or random.Random to use (default None);
+        time_limit      - max no. of seconds of a run, shared by the
+                            repeats (default None);
+        checkpoint_file - file to save checkpoints to (default None);
+        checkpoint_every
+                        - no. of seconds between checkpoints (default 60);
+        start           - lines to start from (none to set them later with
+                            set_state), a saved solution file or
+                            random/greedy to create them (default random);
+        start_runs      - no. of random/greedy runs to take the best start
+                            from (default 1);
+        paths_file      - .npz file to cache the shortest paths in
+                            (default None);
+
+    properties:
+        scheduler   - returns the scheduler that chooses the options;
 
     methods:
+        initial_state               - returns the state to start from;
         get_available_connections   - finds all available/not used connections;
         find_dupes_and_index        - finds all duplicate connections of line;
         chang_section               - change a section of a line;
@@ -35,10 +56,30 @@ class Hill_Climber(Random_Connections):
         remove_duplicates           - remove a duplicate connection from line;
         add_missing                 - adds missing connections where possible;
         change_line_section         - change a random line section;
+        can_cut_ends                - checks if ends_cut can change a line;
+        can_remove_duplicates       - checks if remove_duplicates can change
+                                        a line;
+        can_add_missing             - checks if add_missing can change a
+                                        line;
+        can_change_section          - checks if change_line_section can
+                                        change a line;
+        propose                     - proposes a change of the current state;
+        set_state                   - sets the current state to given lines;
+        update_score                - update score with the changed line;
+        revert_score                - undo score update of rejected change;
+        iterate                     - yields the iterations of a run;
+        run_progress                - returns the progress of a run;
+        checkpoint                  - returns the state to continue from;
+        restore                     - continues from a checkpoint;
+        save_checkpoint             - saves a checkpoint to the file;
+        load_checkpoint             - continues from a checkpoint file;
         run                         - runs algorithm for specified values;
     """
 
-    def __init__(self, connections, max_duration, max_n_of_l):
+    def __init__(self, connections, max_duration, max_n_of_l,
+                 history_every=1, history_file=None, seed=None,
+                 time_limit=None, checkpoint_file=None, checkpoint_every=60,
+                 start="random", start_runs=1, paths_file=None):
         """
         Initializes the Hill Climber Algorithm
 
@@ -46,16 +87,123 @@ class Hill_Climber(Random_Connections):
             connections     - connections in database;
             max_duration    - maximal duration for a line
             max_n_of_l      - maximal number of lines;
+            history_every   - keep one of every n scores in memory
+                (default 1);
+            history_file    - csv file to stream all scores to
+                (default None);
+            seed            - seed or random.Random to use
+                (default None);
+            time_limit      - max no. of seconds of a run, shared by the
+                repeats (default None);
+            checkpoint_file - file to save checkpoints to, a run can be
+                continued from it with load_checkpoint (default None);
+            checkpoint_every
+                            - no. of seconds between checkpoints
+                (default 60);
+            start           - lines to start from (none to set them later
+                with set_state), a file saved with save_solution or
+                random/greedy to create them (default random);
+            start_runs      - no. of random/greedy runs to take the best
+                start from (default 1);
+            paths_file      - .npz file to cache the shortest paths in, so
+                they are only computed once per network (default None);
         """
 
         # init Hill Climber from inheritance
-        super().__init__(connections, max_duration, max_n_of_l)
+        super().__init__(connections, max_duration, max_n_of_l,
+                         history_every, history_file, seed, time_limit)
+
+        # make sure the checkpoints are a positive no. of seconds apart
+        try:
+            self._checkpoint_every = float(checkpoint_every)
+            assert self._checkpoint_every > 0
+        except (AssertionError, ValueError):
+            exit("Hill_ClimberInitError: please make sure checkpoint_every "
+                 "is a positive number of seconds")
+
+        # save checkpoints to this file, the first after checkpoint_every
+        self._checkpoint_file = checkpoint_file
+        self._next_checkpoint = time.perf_counter() + self._checkpoint_every
+
+        # run and iteration to continue from, and the state of that run
+        self._resumed = (0, 0, dict())
+
+        # get the state to start from, it's a result as well if it has lines
+        self._current_state = self.initial_state(start, start_runs)
+        if self._current_state[0]:
+            self._result.add(self._current_state)
+
+        # keep track of the score of the current state
+        self._score = Score(len(connections), self._current_state[0])
+
+        # define connections by id and the bitset of all connections
+        self._connections_by_cid = {connection.cid: connection
+                                    for connection in connections}
+        self._all_connections = 0
+        for connection in connections:
+            self._all_connections |= 1 << connection.cid
+
+        # define path_finder object, the shortest paths are computed once
+        self._pathfinder = Shortest_Paths(connections, max_duration,
+                                          paths_file)
+
+        # the shortest connection, a line with less slack can't be extended
+        self._min_duration = min(connection.duration
+                                 for connection in connections)
+
+        # define the options and the cheap check if they can change a line
+        self._preconditions = {self.ends_cut: self.can_cut_ends,
+                               self.add_missing: self.can_add_missing,
+                               self.remove_duplicates:
+                                   self.can_remove_duplicates,
+                               self.change_line_section:
+                                   self.can_change_section}
+
+        # choose the options by their improvement per second, timings differ
+        #   between runs so seeded runs use the improvement per use
+        self._scheduler = Operator_Scheduler(self._preconditions, self._rng,
+                                             timed=seed is None)
+
+    @property
+    def scheduler(self):
+        """
+        returns the scheduler that chooses the options
+        """
+
+        return self._scheduler
+
+    def initial_state(self, start, start_runs=1):
+        """
+        returns the state to start from
+
+        parameters:
+            start       - lines to start from (none to set them later), a
+                            saved solution file or random/greedy to create
+                            them;
+            start_runs  - no. of random/greedy runs to take the best start
+                            from (default 1);
+        """
+
+        # create the lines with the best of random or greedy runs
+        if start == "random":
+            return super().run(start_runs, progress_bar=False)[0]
+        if start == "greedy":
+            return Greedy(self._connections, self._max_duration,
+                          self._max_n_of_l, seed=self._rng) \
+                .run(start_runs, progress_bar=False)[0]
 
-        # get state from running inheritance
-        self._current_state = super().run(progress_bar=False)[0]
+        # load the lines of a saved solution
+        if isinstance(start, str):
+            start = load_solution(start, self._connections)
 
-        # define path_finder object
-        self._pathfinder = A_Star(connections, max_duration)
+        # make sure the lines fit the max no. of lines and duration
+        lines = list(start)
+        if len(lines) > self._max_n_of_l or \
+                any(line.duration > self._max_duration for line in lines):
+            exit("Hill_ClimberInitError: please make sure the start has "
+                 "lines within the max no. of lines and duration")
+
+        return (lines,) + self.goal_function(lines)
 
     def get_available_connections(self, lines):
         """
@@ -67,22 +215,23 @@ class Hill_Climber(Random_Connections):
         returns available connections
         """
 
-        # predefining used connections dictionary
-        used_connections = dict()
+        # predefining used connections bitset
+        used_connections = 0
 
         # loop over all lines and add used connections
         for line in lines:
-            for connection in line.connections:
-                used_connections[str(connection)] = connection
-
-        # define all connections dictionary
-        all_connections = {str(connection): connection
-                           for connection in self._connections}
+            used_connections |= line.mask
 
         # find the difference between all connections and used connections
-        available_connections = \
-            [all_connections[connection] for connection in
-                all_connections.keys() - used_connections.keys()]
+        missing = self._all_connections & ~used_connections
+
+        # get the connection for each set bit, lowest first
+        available_connections = []
+        while missing:
+            lowest = missing & -missing
+            available_connections.append(
+                self._connections_by_cid[lowest.bit_length() - 1])
+            missing ^= lowest
 
         return available_connections
 
@@ -168,10 +317,14 @@ class Hill_Climber(Random_Connections):
         # if a random section is to be changed choose random indices
         if random:
 
+            # a line without connections has no section to change
+            if len(line.stations) < 2:
+                return line
+
             # make sure the indices can define a section
             while (index0 == index1 or index0 > index1):
-                index0 = rd.randint(0, len(line.stations) - 1)
-                index1 = rd.randint(index0, len(line.stations) - 1)
+                index0 = self._rng.randint(0, len(line.stations) - 1)
+                index1 = self._rng.randint(index0, len(line.stations) - 1)
 
         # if not random and index0 and index1 are given check if valid
         elif "index0" in kwargs.keys() and "index1" in kwargs.keys():
@@ -208,12 +361,13 @@ class Hill_Climber(Random_Connections):
 
         return line
 
-    def ends_cut(self, lines):
+    def ends_cut(self, lines, line_index=None):
         """
         cuts the ends from random line at random end
 
         parameter:
-            lines - lines to change;
+            lines       - lines to change;
+            line_index  - index of the line to change (default random);
 
         returns None if failed, state if successful
         """
@@ -221,38 +375,46 @@ class Hill_Climber(Random_Connections):
         if len(lines) <= 1:
             None
 
-        # get random line
-        line = rd.choice(lines)
+        # choose random line_index from lines if not given
+        if line_index is None:
+            line_index = self._rng.randint(0, len(lines) - 1)
 
         # get line connections
+        line = lines[line_index]
         connections = line.connections
 
-        # get random end of line
-        current_HEAD_index, direction = \
-            rd.choice(line.begin_end_station_index)
-
         # make sure line has more than one connection
         if len(connections) <= 1:
             return None
 
-        # check if duplicate connections present at the chosen end
-        if connections[current_HEAD_index] == \
-                connections[current_HEAD_index + direction]:
+        # get the ends with duplicate connections present
+        ends = [(index, direction) for index, direction
+                in line.begin_end_station_index
+                if connections[index] == connections[index + direction]]
+        if not ends:
+            return None
 
-            # remove duplicate connection
-            line.stations.pop(current_HEAD_index)
-            line.connections.pop(current_HEAD_index)
+        # get random end of line
+        current_HEAD_index, direction = self._rng.choice(ends)
 
-            return lines
+        # get a copy of the line, so other states sharing it are untouched
+        line = line.copy()
 
-        return None
+        # remove duplicate connection
+        line.remove_end(current_HEAD_index)
+
+        # put the changed copy in place of the original line
+        lines[line_index] = line
 
-    def remove_duplicates(self, lines):
+        return lines
+
+    def remove_duplicates(self, lines, line_index=None):
         """
         remove duplicate connections (dupes) in random line from lines
 
         parameter:
-            lines - lines to choose line from to remove dupes from;
+            lines       - lines to choose line from to remove dupes from;
+            line_index  - index of the line to change (default random);
 
         returns lines back or None if failed
         """
@@ -260,21 +422,22 @@ class Hill_Climber(Random_Connections):
         if len(lines) <= 1:
             None
 
-        # choose random line_index from lines
-        line_index = rd.randint(0, len(lines) - 1)
-
-        # remove line from lines
-        line = lines.pop(line_index)
+        # choose random line_index from lines if not given
+        if line_index is None:
+            line_index = self._rng.randint(0, len(lines) - 1)
 
         # find the dupes
-        dupes = self.find_dupes_and_index(line)
+        dupes = self.find_dupes_and_index(lines[line_index])
 
         # if dupes found choose random dupe else return None
         if dupes:
-            remove_duplicate = rd.choice(dupes)
+            remove_duplicate = self._rng.choice(dupes)
         else:
             return None
 
+        # remove line from lines
+        line = lines.pop(line_index)
+
         # find the minimum number of connections needed for this section
         line = self.change_section(line, random=False,
                                    index0=remove_duplicate[2],
@@ -285,12 +448,13 @@ class Hill_Climber(Random_Connections):
 
         return lines
 
-    def add_missing(self, lines):
+    def add_missing(self, lines, line_index=None):
         """
         add missing connections to state where possible
 
         parameter:
-            lines - lines to choose random line to change from;
+            lines       - lines to choose random line to change from;
+            line_index  - index of the line to change (default random);
 
         returns None if failed, lines if successful
         """
@@ -298,15 +462,15 @@ class Hill_Climber(Random_Connections):
         if len(lines) <= 1:
             None
 
-        # define empty used_connections set
-        used_connections = set()
+        # define empty used_connections bitset
+        used_connections = 0
 
         # get all used connections
         for line in lines:
-            used_connections.update(line.connections)
+            used_connections |= line.mask
 
-        # find coverage (p)
-        p = len(used_connections)/len(self._connections)
+        # find coverage (p), the number of set bits
+        p = bin(used_connections).count("1")/len(self._connections)
 
         # get duration condition for each line, duration < max duration
         duration_condition = \
@@ -319,11 +483,16 @@ class Hill_Climber(Random_Connections):
             # get available connections
             available_connections = self.get_available_connections(lines)
 
-            # choose random line
-            line = rd.choice(lines)
+            # choose random line_index from lines if not given
+            if line_index is None:
+                line_index = self._rng.randint(0, len(lines) - 1)
+
+            # get a copy of the line, so other states sharing it are untouched
+            line = lines[line_index].copy()
+            lines[line_index] = line
 
             # choose random missing connection
-            connection = rd.choice(available_connections)
+            connection = self._rng.choice(available_connections)
 
             # define missing_path empty list
             missing_path = []
@@ -338,7 +507,14 @@ class Hill_Climber(Random_Connections):
                     #   if not next to each other
                     if station1 != station2:
                         path = self._pathfinder.create_line(station1, station2)
-                        missing_path.append(path)
+
+                        # only keep paths within the max duration
+                        if path:
+                            missing_path.append(path)
+
+            # make sure a path has been found
+            if not missing_path:
+                return None
 
             # find the shortest path found
             path = min(missing_path, key=lambda x: x.duration)
@@ -364,12 +540,13 @@ class Hill_Climber(Random_Connections):
 
         return None
 
-    def change_line_section(self, lines):
+    def change_line_section(self, lines, line_index=None):
         """
         change random line section of random line from lines
 
         parameter:
-            lines - list of lines to choose line from;
+            lines       - list of lines to choose line from;
+            line_index  - index of the line to change (default random);
 
         returns back lines
         """
@@ -377,8 +554,9 @@ class Hill_Climber(Random_Connections):
         if len(lines) <= 1:
             None
 
-        # choose random line_index
-        line_index = rd.randint(0, len(lines) - 1)
+        # choose random line_index from lines if not given
+        if line_index is None:
+            line_index = self._rng.randint(0, len(lines) - 1)
 
         # remove line from lines
         line = lines.pop(line_index)
@@ -391,77 +569,359 @@ class Hill_Climber(Random_Connections):
 
         return lines
 
-    def run(self, repeat=1, iterations=1):
+    def can_cut_ends(self, line):
+        """
+        checks if ends_cut can change a line, a connection at one of the ends
+            is used twice in a row
+
+        parameter:
+            line - line to check;
+        """
+
+        connections = line.connections
+
+        return len(connections) > 1 and \
+            (connections[0] == connections[1] or
+             connections[-1] == connections[-2])
+
+    def can_remove_duplicates(self, line):
+        """
+        checks if remove_duplicates can change a line, a connection is used
+            twice in a row
+
+        parameter:
+            line - line to check;
+        """
+
+        return line.repeats > 0
+
+    def can_add_missing(self, line):
+        """
+        checks if add_missing can change a line, connections are missing and
+            the line has slack for at least the shortest connection
+
+        parameter:
+            line - line to check;
+        """
+
+        return self._score.covered < len(self._connections) and \
+            line.duration + self._min_duration <= self._max_duration
+
+    def can_change_section(self, line):
+        """
+        checks if change_line_section can change a line, it has a section
+
+        parameter:
+            line - line to check;
+        """
+
+        return len(line.stations) > 1
+
+    def propose(self, line_index):
+        """
+        proposes a change of a line of the current state, the option is
+            chosen by the scheduler from the options that can change it
+
+        parameter:
+            line_index  - index of the line to change;
+
+        returns option, changed lines, their score and the start time of the
+            move, None if no option can change the line
+        """
+
+        # only choose from the options that can change the line
+        line = self._current_state[0][line_index]
+        options = [option for option, applicable
+                   in self._preconditions.items() if applicable(line)]
+        if not options:
+            return None
+
+        # create a copy of the current lines list, the lines are
+        #   shared and only copied by the option that changes them
+        lines = list(self._current_state[0])
+
+        # choose an option by how well it pays off and time the move
+        option = self._scheduler.choose(options)
+        start = time.perf_counter()
+
+        # make sure option worked
+        new_lines = option(lines, line_index)
+        if new_lines:
+            lines = new_lines
+
+        # get new score by only updating the changed line
+        score = self.update_score(lines, line_index)
+
+        return option, lines, score, start
+
+    def set_state(self, lines):
+        """
+        sets the current state to the given lines and scores them
+
+        parameter:
+            lines - lines of the new state;
+        """
+
+        self._score = Score(len(self._connections), lines)
+        self._current_state = (list(lines), self._score.K, self._score.p)
+
+    def update_score(self, lines, line_index):
+        """
+        update the score of the current state with the changed line
+
+        parameters:
+            lines       - lines of the changed state;
+            line_index  - index of the changed line;
+
+        returns the value of the goal function and the coverage
+        """
+
+        return self._score.replace_line(self._current_state[0][line_index],
+                                        lines[line_index])
+
+    def revert_score(self, lines, line_index):
+        """
+        undo the score update of a rejected change
+
+        parameters:
+            lines       - lines of the rejected state;
+            line_index  - index of the changed line;
+        """
+
+        self._score.replace_line(lines[line_index],
+                                 self._current_state[0][line_index])
+
+    def iterate(self, iterations, start=0):
+        """
+        yields the iterations of a run until they're all done or the
+            deadline of the run has passed
+
+        parameters:
+            iterations  - number of iterations, None for no limit;
+            start       - iteration to start from (default 0);
+        """
+
+        iteration = start
+        while (iterations is None or iteration < iterations) and \
+                not self.out_of_time():
+            yield iteration
+            iteration += 1
+
+    def run_progress(self, iteration, iterations):
+        """
+        returns the progress of a run (0 at the start, 1 at the end), by the
+            iterations or the time, whichever runs out first
+
+        parameters:
+            iteration   - number of iterations done;
+            iterations  - number of iterations, None for no limit;
+        """
+
+        progress = self.time_progress()
+        if iterations:
+            progress = max(progress, iteration / iterations)
+
+        return min(progress, 1.)
+
+    def checkpoint(self, run, iteration, **run_state):
+        """
+        returns the state to continue from, the lines are encoded to keep
+            it small
+
+        parameters:
+            run         - run to continue;
+            iteration   - iteration to continue from;
+            run_state   - other variables of the run;
+        """
+
+        return {"algorithm": type(self).__name__,
+                "connections": len(self._connections),
+                "run": run, "iteration": iteration, "run_state": run_state,
+                "state": ([line.encode() for line in self._current_state[0]],)
+                + self._current_state[1:],
+                "results": [([line.encode() for line in lines], K, p)
+                            for lines, K, p in self._result.results],
+                "rng": self._rng.getstate(),
+                "rewards": self._scheduler.rewards,
+                "scores": self._scores,
+                "stats": self._stats}
+
+    def restore(self, checkpoint):
+        """
+        continues from a checkpoint
+
+        parameter:
+            checkpoint - state to continue from (see checkpoint);
+        """
+
+        # make sure the checkpoint is of this algorithm and database
+        if checkpoint["algorithm"] != type(self).__name__ or \
+                checkpoint["connections"] != len(self._connections):
+            exit("CheckpointError: please make sure the checkpoint is of "
+                 "the same algorithm and area")
+
+        # continue from the state, results and random state
+        self.set_state(decode_lines(checkpoint["state"][0],
+                                    self._connections))
+        self._result = Top_Results(self._result.k)
+        self._result.extend((decode_lines(codes, self._connections), K, p)
+                            for codes, K, p in checkpoint["results"])
+        self._rng.setstate(checkpoint["rng"])
+        self._scheduler.rewards = checkpoint["rewards"]
+        self._stats = checkpoint["stats"]
+
+        # continue the scores of the checkpoint, they're streamed on to its
+        #   csv file from where the checkpoint was saved
+        self._scores.close()
+        self._scores = checkpoint["scores"]
+        self._scores.reopen()
+
+        self._resumed = (checkpoint["run"], checkpoint["iteration"],
+                         checkpoint["run_state"])
+
+    def save_checkpoint(self, run, iteration, **run_state):
+        """
+        saves a checkpoint to the checkpoint file, it's written to a
+            temporary file first so a crash can't leave half a checkpoint
+
+        parameters:
+            run         - run to continue;
+            iteration   - iteration to continue from;
+            run_state   - other variables of the run;
+        """
+
+        temporary_file = f"{self._checkpoint_file}.tmp"
+        with open(temporary_file, "wb") as file:
+            pickle.dump(self.checkpoint(run, iteration, **run_state), file,
+                        pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, self._checkpoint_file)
+
+        self._next_checkpoint = time.perf_counter() + self._checkpoint_every
+
+    def load_checkpoint(self, checkpoint_file):
+        """
+        continues from a checkpoint file, the next run continues where the
+            checkpoint was saved
+
+        parameter:
+            checkpoint_file - file with the checkpoint;
+        """
+
+        try:
+            with open(checkpoint_file, "rb") as file:
+                checkpoint = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            exit("CheckpointError: please make sure the checkpoint file "
+                 "exists and is a checkpoint")
+
+        self.restore(checkpoint)
+
+    def run(self, repeat=1, iterations=1, progress_bar=True):
         """
         run this algorithm
 
         parameters:
-            repeat      - number of times to repeat the algorithm (default 1);
-            iterations  - number of tries to change the current state
+            repeat          - number of times to repeat the algorithm
                 (default 1);
+            iterations      - number of tries to change the current state,
+                None to run until the time limit (default 1);
+            progress_bar    - do I need to show the progress? (default True);
+
+        returns the result
         """
 
-        # make sure iterations and repeat are integers
+        # make sure iterations and repeat are integers, or the time limited
         try:
             int(repeat)
-            int(iterations)
-        except ValueError:
+            assert iterations is not None or self._time_limit
+            iterations = int(iterations) if iterations is not None else None
+        except (AssertionError, ValueError):
             exit("RunError: please make sure you've entered a integer "
                  "for the number of repeats and iterations")
 
-        # print running paramters
-        print(f"Runing, Hill Climber {repeat} times with "
-              f"{iterations} iterations per run")
+        # make sure there are lines to change
+        if not self._current_state[0]:
+            exit("RunError: please make sure there are lines to start from, "
+                 "an empty start has to be set with set_state")
 
-        # define the progressbar widgets
-        bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
+        # show progress bar
+        if progress_bar:
 
-        # define the progress bar and start it
-        bar = pbar.ProgressBar(maxval=repeat*iterations,
-                               widgets=bar_widgets).start()
+            # print running paramters
+            budget = f"{iterations} iterations" if iterations is not None \
+                else f"{self._time_limit / repeat:g} seconds"
+            print(f"Runing, Hill Climber {repeat} times with {budget} per "
+                  "run")
 
-        # repeat the algorithm as many times as specified
-        for run in range(repeat):
-            # loop for each iteration
-            for iteration in range(iterations):
+            # define the progressbar widgets
+            bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
 
-                # create a copy of the current state
-                state = copy.deepcopy(self._current_state)
+            # define the progress bar and start it, it counts the runs
+            bar = pbar.ProgressBar(maxval=repeat,
+                                   widgets=bar_widgets).start()
 
-                # define options
-                options = [self.ends_cut, self.add_missing,
-                           self.remove_duplicates, self.change_line_section]
+        # continue from a checkpoint, if loaded
+        start_run, start_iteration, _ = self._resumed
+        self._resumed = (0, 0, dict())
 
-                # define lines (from state)
-                lines = state[0]
-
-                # choose random option
-                new_lines = rd.choice(options)(lines)
-
-                # make sure option worked
-                if new_lines:
-                    lines = new_lines
-
-                # get new score
-                score = self.goal_function(lines)
-
-                # check if score has been improved
-                if score[0] > self._current_state[1]:
-                    self._current_state = (lines,) + score
+        # repeat the algorithm as many times as specified
+        for run in range(start_run, repeat):
 
-                # add result to results attribute and save score/iterations
-                self._result.append(self._current_state)
-                self._scores[run]["iterations"].append(iteration)
-                self._scores[run]["scores"].append(self._current_state[1])
+            # each run gets an equal share of the time
+            self.set_deadline(self._time_limit and self._time_limit / repeat)
 
-                # save the 5 best results
-                self._result = sorted(self._result, key=lambda x: x[1],
-                                      reverse=True)[:5]
+            # loop for each iteration
+            for iteration in self.iterate(iterations, start_iteration
+                                          if run == start_run else 0):
+
+                # choose random line to change and propose a change
+                n_of_l = len(self._current_state[0])
+                line_index = self._rng.randint(0, n_of_l - 1)
+                old_score = self._current_state[1]
+                move = self.propose(line_index)
+
+                # skip lines no option can change
+                if move:
+                    option, lines, score, start = move
+
+                    # check if score has been improved, else undo update
+                    accepted = score[0] > old_score
+                    if accepted:
+                        self._current_state = (lines,) + score
+
+                        # add new state to results attribute
+                        self._result.add(self._current_state)
+                    else:
+                        self.revert_score(lines, line_index)
+
+                    # keep the stats and reward of the option
+                    seconds = time.perf_counter() - start
+                    self._stats.record(option.__name__, accepted, seconds,
+                                       score[0] - old_score)
+                    self._scheduler.update(option, score[0] - old_score,
+                                           seconds)
+
+                # save score/iterations
+                self._scores.record(run, iterations=iteration,
+                                    scores=self._current_state[1])
 
                 # update progress bar
-                bar.update(run*iterations + iteration + 1)
+                if progress_bar:
+                    bar.update(run + self.run_progress(iteration + 1,
+                                                       iterations))
+
+                # save a checkpoint every so many seconds
+                if self._checkpoint_file and \
+                        time.perf_counter() >= self._next_checkpoint:
+                    self.save_checkpoint(run, iteration + 1)
 
         # finish progress bar
-        bar.finish()
+        if progress_bar:
+            bar.finish()
+
+        # save the final state, write the streamed scores and close the csv
+        if self._checkpoint_file:
+            self.save_checkpoint(repeat, 0)
+        self._scores.close()
 
-        return self._result
+        return self._result.results
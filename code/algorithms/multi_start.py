@@ -0,0 +1,294 @@
+"""
+version: python 3.8
+multi_start.py defines the Multi_Start runner, which spreads the repeats of
+    an algorithm over a pool of worker processes
+
+methods:
+    init_worker     - recreates the stations and connections in a worker;
+    run_chunk       - runs a chunk of repeats of an algorithm in a worker;
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import os
+import time
+import random as rd
+import progressbar as pbar
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from code.algorithms import Hill_Climber
+from code.classes import Top_Results, Score_History, Operator_Stats
+from code.data_loader.load_data import create_views, decode_lines
+
+# connections of the worker process, set by init_worker
+worker_connections = None
+
+
+def init_worker(graph):
+    """
+    recreates the stations and connections from the graph in a worker
+
+    parameter:
+        graph - graph of the database;
+    """
+
+    global worker_connections
+
+    worker_connections = create_views(graph)[1]
+
+
+def run_chunk(algorithm, max_duration, max_n_of_l, options, repeat,
+              iterations, seed, deadline=None):
+    """
+    runs a chunk of repeats of an algorithm in a worker
+
+    parameters:
+        algorithm       - algorithm class to run;
+        max_duration    - max duration for the lines;
+        max_n_of_l      - max number of lines;
+        options         - other keyword arguments for the algorithm;
+        repeat          - number of repeats in this chunk;
+        iterations      - number of iterations per repeat (None if the
+                            algorithm has no iterations, or a time limited
+                            local search runs until the deadline);
+        seed            - seed for the random number generator;
+        deadline        - time.time() at which the chunk has to be done
+                            (default None);
+
+    returns the encoded result, the scores and the operator stats of this
+        chunk
+    """
+
+    # the chunk gets the time left until the deadline
+    if deadline is not None:
+        options = dict(options, time_limit=max(deadline - time.time(), 1e-3))
+
+    # create and run the algorithm without progress bar, each chunk is
+    #   seeded so it has its own random stream
+    instance = algorithm(worker_connections, max_duration, max_n_of_l,
+                         seed=seed, **options)
+    if iterations is None and not (deadline is not None and
+                                   isinstance(instance, Hill_Climber)):
+        result = instance.run(repeat, progress_bar=False)
+    else:
+        result = instance.run(repeat, iterations, progress_bar=False)
+
+    # encode the lines, so they can be sent back without the whole database
+    result = [([line.encode() for line in lines], K, p)
+              for lines, K, p in result]
+
+    return result, instance.scores, instance.stats
+
+
+class Multi_Start():
+    """
+    Defines the Multi_Start runner, runs independent repeats of an algorithm
+        in parallel and merges the results
+
+    parameters:
+        algorithm       - algorithm class to run;
+        connections     - connections in database;
+        max_duration    - max duration for the lines;
+        max_n_of_l      - max number of lines;
+        workers         - number of worker processes (default no. of cpus);
+        seed            - seed or random.Random to generate the chunk seeds
+                            (default None);
+        history_every   - keep one of every n scores in memory (default 1);
+        history_file    - csv file to stream all scores to (default None);
+        time_limit      - max no. of seconds of the run (default None);
+        options         - other keyword arguments for the algorithm;
+
+    properties:
+        result  - returns the result for this algorithm;
+        scores  - returns the scores of this algorithm;
+        stats   - returns the operator stats of this algorithm;
+        rng     - returns the random number generator of this runner;
+
+    methods:
+        run - runs the algorithm in parallel;
+    """
+
+    def __init__(self, algorithm, connections, max_duration, max_n_of_l,
+                 workers=None, seed=None, history_every=1, history_file=None,
+                 time_limit=None, **options):
+        """
+        initialize the multi start runner
+
+        parameters:
+            algorithm       - algorithm class to run;
+            connections     - connections in database;
+            max_duration    - max duration for the lines;
+            max_n_of_l      - max number of lines;
+            workers         - number of worker processes
+                (default no. of cpus);
+            seed            - seed or random.Random to generate the chunk
+                seeds, the same seed gives the same run (default None);
+            history_every   - keep one of every n scores in memory
+                (default 1);
+            history_file    - csv file to stream all scores to
+                (default None);
+            time_limit      - max no. of seconds of the run, shared by the
+                workers (default None);
+            options         - other keyword arguments for the algorithm;
+        """
+
+        # make sure workers is a positive integer
+        try:
+            workers = int(workers) if workers else os.cpu_count()
+            assert workers > 0
+        except (AssertionError, ValueError):
+            exit("Multi_StartInitError: please make sure workers is a "
+                 "positive integer")
+
+        self._algorithm = algorithm
+        self._connections = connections
+        self._graph = connections[0].graph
+        self._max_duration = max_duration
+        self._max_n_of_l = max_n_of_l
+        self._workers = workers
+        self._time_limit = time_limit
+        if isinstance(seed, rd.Random):
+            self._rng = seed
+        else:
+            self._rng = rd.Random(seed)
+
+        # unseeded runs give the chunks no seed, they're random anyway
+        self._seeded = seed is not None
+
+        # the workers keep every n-th score, but if all scores are streamed
+        #   they send them all and the merged scores are thinned out
+        if history_file:
+            self._options = dict(options, history_every=1)
+            self._scores = Score_History(history_every, history_file)
+        else:
+            self._options = dict(options, history_every=history_every)
+            self._scores = Score_History()
+
+        # predefine result and stats attribute
+        self._result = Top_Results()
+        self._stats = Operator_Stats()
+
+    @property
+    def result(self):
+        """
+        returns the result for this algorithm
+        """
+
+        return self._result.results
+
+    @property
+    def scores(self):
+        """
+        returns the scores of this algorithm
+        """
+
+        return self._scores
+
+    @property
+    def stats(self):
+        """
+        returns the operator stats of this algorithm
+        """
+
+        return self._stats
+
+    @property
+    def rng(self):
+        """
+        returns the random number generator of this runner
+        """
+
+        return self._rng
+
+    def run(self, repeat=1, iterations=None, progress_bar=True):
+        """
+        run the algorithm in parallel
+
+        parameters:
+            repeat          - number of repeats to do for this algorithm;
+            iterations      - number of iterations per repeat (default None);
+            progress_bar    - do I need to show the progress? (default True);
+
+        returns the result
+        """
+
+        # make sure repeat is an integer
+        try:
+            repeat = int(repeat)
+        except ValueError:
+            exit("RunError: please make sure you've entered a int "
+                 "for the number of repeats")
+
+        # split the repeats into chunks, a few per worker to balance load,
+        #   or one per worker if they all run until the same deadline
+        if self._time_limit:
+            n_of_chunks = min(repeat, self._workers)
+            deadline = time.time() + self._time_limit
+        else:
+            n_of_chunks = min(repeat, self._workers * 4)
+            deadline = None
+        chunks = [repeat // n_of_chunks + (i < repeat % n_of_chunks)
+                  for i in range(n_of_chunks)]
+
+        # show progress bar
+        if progress_bar:
+
+            # print running parameters
+            print(f"Runing, {self._algorithm.__name__} {repeat} times on "
+                  f"{self._workers} workers")
+
+            # define the progress bar widgets
+            bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
+
+            # create the progress bar and start
+            bar = pbar.ProgressBar(maxval=repeat,
+                                   widgets=bar_widgets).start()
+
+            # initiate step to 0
+            step = 0
+
+        with ProcessPoolExecutor(self._workers, initializer=init_worker,
+                                 initargs=(self._graph,)) as executor:
+
+            # submit each chunk with its own seed and first repeat
+            futures = dict()
+            offset = 0
+            for chunk in chunks:
+                future = executor.submit(run_chunk, self._algorithm,
+                                         self._max_duration,
+                                         self._max_n_of_l, self._options,
+                                         chunk, iterations,
+                                         self._rng.randrange(2**32)
+                                         if self._seeded else None,
+                                         deadline)
+                futures[future] = (offset, chunk)
+                offset += chunk
+
+            # merge results and scores when chunks are done
+            for future in as_completed(futures):
+                offset, chunk = futures[future]
+                result, scores, stats = future.result()
+
+                self._result.extend((decode_lines(codes, self._connections),
+                                     K, p) for codes, K, p in result)
+                self._scores.merge(scores, offset)
+                self._stats.merge(stats)
+
+                # update progress bar
+                if progress_bar:
+                    step += chunk
+
+                    bar.update(step)
+
+        # finish the progress bar
+        if progress_bar:
+            bar.finish()
+
+        # write the streamed scores and close the csv file
+        self._scores.close()
+
+        return self._result.results
@@ -0,0 +1,411 @@
+"""
+version: python 3.8
+parallel_tempering.py defines the Parallel_Tempering algorithm, which runs
+    chains of simulated annealing at a ladder of fixed temperatures on a pool
+    of worker processes and swaps the states of neighbouring chains
+
+methods:
+    init_worker - recreates the connections and annealing engine in a worker;
+    run_chain   - runs a chain at a fixed temperature in a worker;
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import os
+import time
+import itertools
+import random as rd
+import progressbar as pbar
+
+from concurrent.futures import ProcessPoolExecutor
+
+from code.algorithms import Random_Connections, Simulated_Annealing
+from code.classes import Top_Results, Score_History, Operator_Stats
+from code.data_loader.load_data import create_views, decode_lines
+
+# connections and annealing engine of the worker process, set by init_worker
+worker_connections = None
+worker_engine = None
+
+
+def init_worker(graph, max_duration, max_n_of_l, options):
+    """
+    recreates the connections from the graph and the annealing engine that
+        runs the chains in a worker, the engine starts without lines as the
+        chains set their own
+
+    parameters:
+        graph           - graph of the database;
+        max_duration    - max duration for the lines;
+        max_n_of_l      - max number of lines;
+        options         - other keyword arguments for the engine;
+    """
+
+    global worker_connections, worker_engine
+
+    worker_connections = create_views(graph)[1]
+    worker_engine = Simulated_Annealing(worker_connections, max_duration,
+                                        max_n_of_l, start=[], **options)
+
+
+def run_chain(codes, rewards, temperature, iterations, seed):
+    """
+    runs a chain at a fixed temperature in a worker
+
+    parameters:
+        codes       - encoded lines to start from;
+        rewards     - operator rewards of the chain (None to start fresh);
+        temperature - temperature of the chain;
+        iterations  - number of tries to change the state;
+        seed        - seed for the random number generator;
+
+    returns the encoded final state, the encoded best results, the
+        operator stats and the operator rewards of the chain
+    """
+
+    # seed the engine, so the chain only depends on its lines and seed
+    worker_engine.rng.seed(seed)
+
+    # run the chain from the decoded lines
+    lines = decode_lines(codes, worker_connections)
+    state, results = worker_engine.run_chain(lines, temperature, iterations,
+                                             rewards)
+
+    # encode the lines, so they can be sent back without the whole database
+    state = ([line.encode() for line in state[0]],) + tuple(state[1:])
+    results = [([line.encode() for line in lines], K, p)
+               for lines, K, p in results]
+
+    return state, results, worker_engine.stats, \
+        worker_engine.scheduler.rewards
+
+
+class Parallel_Tempering():
+    """
+    Defines the Parallel_Tempering algorithm (replica exchange), every round
+        each chain runs a number of iterations at its own temperature, after
+        which neighbouring chains swap their states with a chance of
+        2^((K_j - K_i) * (1/T_i - 1/T_j)), so good states move to the cold
+        chains and stuck states get heated up
+
+    parameters:
+        connections     - connections in database;
+        max_duration    - max duration for the lines;
+        max_n_of_l      - max number of lines;
+        workers         - number of worker processes (default no. of cpus);
+        seed            - seed or random.Random to use (default None);
+        history_every   - keep one of every n scores in memory (default 1);
+        history_file    - csv file to stream all scores to (default None);
+        chains          - number of chains (default no. of workers);
+        max_temperature - temperature of the hottest chain (default the
+                            score of one connection);
+        min_temperature - temperature of the coldest chain (default
+                            max_temperature / 1000);
+        exchange_every  - no. of iterations between swaps (default 100);
+        time_limit      - max no. of seconds of a run, shared by the
+                            repeats (default None);
+        options         - other keyword arguments for the engine;
+
+    properties:
+        result          - returns the result for this algorithm;
+        scores          - returns the scores of this algorithm;
+        stats           - returns the operator stats of this algorithm;
+        rng             - returns the random number generator;
+        temperatures    - returns the temperature of each chain;
+
+    methods:
+        swap_chance - returns the chance to swap the states of two chains;
+        exchange    - swaps the states of neighbouring chains;
+        run         - runs the algorithm;
+    """
+
+    def __init__(self, connections, max_duration, max_n_of_l, workers=None,
+                 seed=None, history_every=1, history_file=None, chains=None,
+                 max_temperature=None, min_temperature=None,
+                 exchange_every=100, time_limit=None, **options):
+        """
+        initialize parallel tempering
+
+        parameters:
+            connections     - connections in database;
+            max_duration    - max duration for the lines;
+            max_n_of_l      - max number of lines;
+            workers         - number of worker processes
+                (default no. of cpus);
+            seed            - seed or random.Random to use (default None);
+            history_every   - keep one of every n scores in memory
+                (default 1);
+            history_file    - csv file to stream all scores to
+                (default None);
+            chains          - number of chains (default no. of workers);
+            max_temperature - temperature of the hottest chain (default the
+                score of one connection);
+            min_temperature - temperature of the coldest chain (default
+                max_temperature / 1000);
+            exchange_every  - no. of iterations between swaps (default 100);
+            time_limit      - max no. of seconds of a run, shared by the
+                repeats (default None);
+            options         - other keyword arguments for the engine;
+        """
+
+        # make sure workers, chains and exchange_every are positive integers
+        #   and the time limit is a positive number
+        try:
+            workers = int(workers) if workers else os.cpu_count()
+            chains = int(chains) if chains else workers
+            exchange_every = int(exchange_every)
+            time_limit = float(time_limit) if time_limit else None
+            assert workers > 0 and chains > 0 and exchange_every > 0
+            assert time_limit is None or time_limit > 0
+        except (AssertionError, ValueError):
+            exit("Parallel_TemperingInitError: please make sure workers, "
+                 "chains and exchange_every are positive integers and the "
+                 "time limit is a positive number")
+
+        self._connections = connections
+        self._graph = connections[0].graph
+        self._max_duration = max_duration
+        self._max_n_of_l = max_n_of_l
+        self._workers = workers
+        self._exchange_every = exchange_every
+        self._time_limit = time_limit
+
+        # use an own random number generator, or the one given
+        if isinstance(seed, rd.Random):
+            self._rng = seed
+        else:
+            self._rng = rd.Random(seed)
+
+        # a seeded engine makes the chains reproducible
+        self._seeded = seed is not None
+        self._options = dict(options, seed=self._rng.randrange(2**32)
+                             if self._seeded else None)
+
+        # geometric ladder of temperatures, from cold to hot
+        if max_temperature is None:
+            max_temperature = 10000 / len(connections)
+        if min_temperature is None:
+            min_temperature = max_temperature / 1000
+        if chains == 1:
+            self._temperatures = [float(min_temperature)]
+        else:
+            self._temperatures = [min_temperature * (max_temperature /
+                                                     min_temperature) **
+                                  (chain / (chains - 1))
+                                  for chain in range(chains)]
+
+        # start each chain from a random state
+        self._states = [Random_Connections(connections, max_duration,
+                                           max_n_of_l, seed=self._rng)
+                        .run(progress_bar=False)[0] for _ in range(chains)]
+
+        # each chain learns which operators pay off at its own temperature
+        self._rewards = [None] * chains
+
+        # predefine result, scores and stats attribute
+        self._result = Top_Results()
+        self._result.extend(self._states)
+        self._scores = Score_History(history_every, history_file)
+        self._stats = Operator_Stats()
+
+    @property
+    def result(self):
+        """
+        returns the result for this algorithm
+        """
+
+        return self._result.results
+
+    @property
+    def scores(self):
+        """
+        returns the scores of this algorithm
+        """
+
+        return self._scores
+
+    @property
+    def stats(self):
+        """
+        returns the operator stats of this algorithm
+        """
+
+        return self._stats
+
+    @property
+    def rng(self):
+        """
+        returns the random number generator
+        """
+
+        return self._rng
+
+    @property
+    def temperatures(self):
+        """
+        returns the temperature of each chain, from cold to hot
+        """
+
+        return self._temperatures
+
+    def swap_chance(self, chain1, chain2):
+        """
+        returns the chance to swap the states of two chains
+
+        parameters:
+            chain1  - index of the first chain;
+            chain2  - index of the second chain;
+        """
+
+        exponent = (self._states[chain2][1] - self._states[chain1][1]) * \
+            (1 / self._temperatures[chain1] - 1 / self._temperatures[chain2])
+
+        # always swap if the colder chain gets the better state
+        if exponent >= 0:
+            return 1
+
+        return 2 ** exponent
+
+    def exchange(self, round_number):
+        """
+        swaps the states of neighbouring chains, the even pairs in even
+            rounds and the odd pairs in odd rounds
+
+        parameter:
+            round_number - number of the round;
+
+        returns the number of swaps
+        """
+
+        swaps = 0
+        for chain in range(round_number % 2, len(self._states) - 1, 2):
+            if self._rng.random() < self.swap_chance(chain, chain + 1):
+                self._states[chain], self._states[chain + 1] = \
+                    self._states[chain + 1], self._states[chain]
+                swaps += 1
+
+        return swaps
+
+    def run(self, repeat=1, iterations=1000, progress_bar=True):
+        """
+        run the algorithm, each repeat continues from the current states
+
+        parameters:
+            repeat          - number of times to repeat the algorithm
+                (default 1);
+            iterations      - number of iterations per chain, None to run
+                until the time limit (default 1000);
+            progress_bar    - do I need to show the progress? (default True);
+
+        returns the result
+        """
+
+        # make sure iterations and repeat are integers, or the time limited
+        try:
+            repeat = int(repeat)
+            assert iterations is not None or self._time_limit
+            iterations = int(iterations) if iterations is not None else None
+        except (AssertionError, ValueError):
+            exit("RunError: please make sure you've entered a integer "
+                 "for the number of repeats and iterations")
+
+        # split the iterations into rounds between the swaps
+        if iterations is None:
+            rounds = itertools.repeat(self._exchange_every)
+        else:
+            rounds = [self._exchange_every] * (iterations //
+                                               self._exchange_every)
+            if iterations % self._exchange_every:
+                rounds.append(iterations % self._exchange_every)
+
+        # each run gets an equal share of the time
+        seconds = self._time_limit and self._time_limit / repeat
+
+        # show progress bar
+        if progress_bar:
+
+            # print running parameters
+            budget = f"{iterations} iterations" if iterations is not None \
+                else f"{seconds:g} seconds"
+            print(f"Runing, Parallel Tempering {repeat} times with "
+                  f"{len(self._states)} chains of {budget} on "
+                  f"{self._workers} workers")
+
+            # define the progress bar widgets
+            bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
+
+            # create the progress bar and start, it counts the runs
+            bar = pbar.ProgressBar(maxval=repeat,
+                                   widgets=bar_widgets).start()
+
+        with ProcessPoolExecutor(self._workers, initializer=init_worker,
+                                 initargs=(self._graph, self._max_duration,
+                                           self._max_n_of_l,
+                                           self._options)) as executor:
+
+            done = 0
+            for run in range(repeat):
+                started = time.perf_counter()
+                run_done = 0
+                for round_number, round_iterations in enumerate(rounds):
+
+                    # run all chains at their own temperature and seed
+                    futures = [executor.submit(
+                        run_chain, [line.encode() for line in state[0]],
+                        rewards, temperature, round_iterations,
+                        self._rng.randrange(2**32) if self._seeded
+                        else None)
+                        for state, rewards, temperature
+                        in zip(self._states, self._rewards,
+                               self._temperatures)]
+
+                    # collect the states, results, stats and rewards of the
+                    #   chains
+                    for chain, future in enumerate(futures):
+                        state, results, stats, rewards = future.result()
+
+                        self._rewards[chain] = rewards
+
+                        self._states[chain] = (decode_lines(
+                            state[0], self._connections),) + state[1:]
+                        self._result.extend((decode_lines(
+                            codes, self._connections), K, p)
+                            for codes, K, p in results)
+                        self._stats.merge(stats)
+
+                    done += round_iterations
+                    run_done += round_iterations
+
+                    # save the score of each chain
+                    for chain, state in enumerate(self._states):
+                        self._scores.record(chain, iterations=done,
+                                            scores=state[1])
+
+                    # swap the states of neighbouring chains
+                    self.exchange(round_number)
+
+                    # progress of the run by the iterations or the time
+                    progress = run_done / iterations if iterations else 0.
+                    if seconds:
+                        progress = max(progress, (time.perf_counter() -
+                                                  started) / seconds)
+
+                    # update progress bar
+                    if progress_bar:
+                        bar.update(run + min(progress, 1.))
+
+                    # stop the run when out of time
+                    if progress >= 1:
+                        break
+
+        # finish the progress bar
+        if progress_bar:
+            bar.finish()
+
+        # write the streamed scores and close the csv file
+        self._scores.close()
+
+        return self._result.results
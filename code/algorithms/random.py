@@ -10,11 +10,11 @@ authors:
 # used imports
 import random as rd
 import math
+import time
+import numpy as np
 import progressbar as pbar
 
-from collections import defaultdict
-
-from code.classes import Line
+from code.classes import Line, Top_Results, Score_History, Operator_Stats
 
 
 class Random_Connections():
@@ -25,18 +25,32 @@ class Random_Connections():
         connections     - connections in database;
         max_duration    - max duration for the lines;
         max_n_of_l      - max number of lines;
+        history_every   - keep one of every n scores in memory (default 1);
+        history_file    - csv file to stream all scores to (default None);
+        seed            - seed or random.Random to use (default None);
+        time_limit      - max no. of seconds of a run (default None);
 
     properties:
-        result  - returns the result for this algorithm;
-        scores  - returns the scores of this algorithm;
+        result      - returns the result for this algorithm;
+        scores      - returns the scores of this algorithm;
+        stats       - returns the operator stats of this algorithm;
+        rng         - returns the random number generator of this algorithm;
+        time_limit  - returns the max no. of seconds of a run;
 
     methods:
-        create_line     - creates a line for this algorithm;
-        goal_function   - defines the goal function;
-        run             - runs this algorithm;
+        set_deadline        - starts the clock of a run;
+        out_of_time         - checks if the deadline of the run has passed;
+        time_progress       - returns the elapsed fraction of the time;
+        create_line         - creates a line for this algorithm;
+        goal_function       - defines the goal function;
+        usage_matrix        - returns connection usage counts per solution;
+        batch_goal_function - defines the goal function for many solutions;
+        run                 - runs this algorithm;
     """
 
-    def __init__(self, connections, max_duration, max_n_of_l):
+    def __init__(self, connections, max_duration, max_n_of_l,
+                 history_every=1, history_file=None, seed=None,
+                 time_limit=None):
         """
         initialize the random algorithm
 
@@ -44,8 +58,28 @@ class Random_Connections():
             connections     - connections in database;
             max_duration    - max duration for the lines;
             max_n_of_l      - max number of lines;
+            history_every   - keep one of every n scores in memory
+                (default 1);
+            history_file    - csv file to stream all scores to
+                (default None);
+            seed            - seed or random.Random to use, the same seed
+                gives the same run (default None);
+            time_limit      - max no. of seconds of a run, it then stops
+                with the results found so far (default None);
         """
 
+        # make sure the time limit is a positive number
+        try:
+            self._time_limit = float(time_limit) if time_limit else None
+            assert self._time_limit is None or self._time_limit > 0
+        except (AssertionError, ValueError):
+            exit("Random_ConnectionsInitError: please make sure the time "
+                 "limit is a positive number of seconds")
+
+        # start and deadline of the current run, no deadline until it runs
+        self._started = time.perf_counter()
+        self._deadline = None
+
         self._connections = connections
         self._max_duration = max_duration
         self._max_n_of_l = max_n_of_l
@@ -54,9 +88,22 @@ class Random_Connections():
         self._min_n_of_l = math.ceil(sum(connection.duration for connection
                                      in connections)/max_duration)
 
+        # keep the connection durations by connection id for batch scoring
+        self._durations = np.zeros(max(connection.cid for connection
+                                       in connections) + 1)
+        for connection in connections:
+            self._durations[connection.cid] = connection.duration
+
         # predefine result and scores attribute
-        self._result = []
-        self._scores = defaultdict(lambda: defaultdict(list))
+        self._result = Top_Results()
+        self._scores = Score_History(history_every, history_file)
+        self._stats = Operator_Stats()
+
+        # use an own random number generator, or the one given
+        if isinstance(seed, rd.Random):
+            self._rng = seed
+        else:
+            self._rng = rd.Random(seed)
 
     @property
     def result(self):
@@ -64,7 +111,7 @@ class Random_Connections():
         returns the result for this algorithm
         """
 
-        return self._result
+        return self._result.results
 
     @property
     def scores(self):
@@ -74,6 +121,61 @@ class Random_Connections():
 
         return self._scores
 
+    @property
+    def stats(self):
+        """
+        returns the operator stats of this algorithm (local searches only)
+        """
+
+        return self._stats
+
+    @property
+    def rng(self):
+        """
+        returns the random number generator of this algorithm
+        """
+
+        return self._rng
+
+    @property
+    def time_limit(self):
+        """
+        returns the max no. of seconds of a run
+        """
+
+        return self._time_limit
+
+    def set_deadline(self, seconds):
+        """
+        starts the clock of a run that may take the given no. of seconds
+
+        parameter:
+            seconds - no. of seconds the run may take (None for no limit);
+        """
+
+        self._started = time.perf_counter()
+        self._deadline = None if seconds is None else self._started + seconds
+
+    def out_of_time(self):
+        """
+        checks if the deadline of the run has passed
+        """
+
+        return self._deadline is not None and \
+            time.perf_counter() >= self._deadline
+
+    def time_progress(self):
+        """
+        returns the elapsed fraction of the time until the deadline, 0 if
+            there is no deadline
+        """
+
+        if self._deadline is None:
+            return 0.
+
+        return (time.perf_counter() - self._started) / \
+            (self._deadline - self._started)
+
     def create_line(self):
         """
         create a line for this algorithm
@@ -85,18 +187,19 @@ class Random_Connections():
         line = Line()
 
         # add an random begin connection
-        line.add_connection(rd.choice(self._connections), self._max_duration)
+        line.add_connection(self._rng.choice(self._connections),
+                            self._max_duration)
 
         # while there can still be added connections do this
         while (line.duration + min(line.get_all_options().values(),
                key=lambda x: x[0].duration)[0].duration <= self._max_duration):
 
             # get random options from begin or end of this line
-            options = rd.choice(line.get_begin_end_options())
+            options = self._rng.choice(line.get_begin_end_options())
 
             # add random connection from options to line
             connection_options = [option[0] for option in options.values()]
-            line.add_connection(rd.choice(connection_options),
+            line.add_connection(self._rng.choice(connection_options),
                                 self._max_duration)
 
         return line
@@ -112,22 +215,67 @@ class Random_Connections():
         returns the value of the goal function and the coverage
         """
 
-        # predefine used connections and number of minutes to the penalty value
-        used_connections = set()
+        # predefine used connections bitset and minutes to the penalty value
+        used_connections = 0
         Min = penalty
 
         # for each line in lines find used connections and add minutes
         for line in lines:
             Min += line.duration
-            for connection in line.connections:
-                used_connections.add(connection)
+            used_connections |= line.mask
 
-        # calculate the coverage and define the number of lines
-        p = len(used_connections)/len(self._connections)
+        # calculate the coverage (count set bits) and the number of lines
+        p = bin(used_connections).count("1")/len(self._connections)
         T = len(lines)
 
         return p * 10000 - (T * 100 + Min), p
 
+    def usage_matrix(self, solutions):
+        """
+        counts how often each connection is used in each solution, to score
+            solutions that aren't kept as lines, goal_function is faster for
+            lines as they keep their duration and bitset
+
+        parameter:
+            solutions - list of solutions (lists of lines);
+
+        returns matrix with a row per solution and a column per connection id
+        """
+
+        # get the connection ids used per solution
+        cids = [[connection.cid for line in lines
+                 for connection in line.connections] for lines in solutions]
+
+        # give each solution its own range of ids and count them at once
+        n_of_c = len(self._durations)
+        rows = np.repeat(np.arange(len(solutions)) * n_of_c,
+                         [len(solution_cids) for solution_cids in cids])
+        flat = np.fromiter((cid for solution_cids in cids
+                            for cid in solution_cids), dtype=np.int64,
+                           count=len(rows))
+
+        return np.bincount(rows + flat, minlength=len(solutions) * n_of_c) \
+            .reshape(len(solutions), n_of_c)
+
+    def batch_goal_function(self, usage, n_of_l, penalty=0):
+        """
+        define the goal function for many solutions at once
+
+        parameters:
+            usage   - connection usage counts per solution (usage_matrix);
+            n_of_l  - number of lines per solution;
+            penalty - penalties for the solutions (default is 0);
+
+        returns arrays of the values of the goal function and the coverages
+        """
+
+        # calculate coverage, number of lines and minutes for all solutions
+        p = np.count_nonzero(usage, axis=1) / len(self._connections)
+        T = np.asarray(n_of_l)
+        Min = usage @ self._durations + penalty
+
+        return p * 10000 - (T * 100 + Min), p
+
     def run(self, repeat=1, progress_bar=True):
         """
         run this algorithm
@@ -164,6 +312,9 @@ class Random_Connections():
             # initiate step to 0
             step = 0
 
+        # start the clock
+        self.set_deadline(self._time_limit)
+
         # loop for each repeat
         for run in range(repeat):
 
@@ -177,13 +328,13 @@ class Random_Connections():
                 for _ in range(n_of_l):
                     lines.append(self.create_line())
 
-                # get score
+                # get score, the lines keep their duration and bitset
                 goal_function_result = self.goal_function(lines)
 
                 # add result to results attribute and save score
-                self._result.append((lines,) + goal_function_result)
-                self._scores[n_of_l]["runs"].append(run)
-                self._scores[n_of_l]["scores"].append(goal_function_result[0])
+                self._result.add((lines,) + goal_function_result)
+                self._scores.record(n_of_l, runs=run,
+                                    scores=goal_function_result[0])
 
                 # update progress bar
                 if progress_bar:
@@ -191,12 +342,18 @@ class Random_Connections():
 
                     bar.update(step)
 
-            # save the 5 best results
-            self._result = sorted(self._result, key=lambda x: x[1],
-                                  reverse=True)[:5]
+                # stop with the solutions so far when out of time
+                if self.out_of_time():
+                    break
+
+            if self.out_of_time():
+                break
 
         # finish the progress bar
         if progress_bar:
             bar.finish()
 
-        return self._result
+        # write the streamed scores
+        self._scores.flush()
+
+        return self._result.results
@@ -0,0 +1,238 @@
+"""
+version: python 3.8
+shortest_paths.py gives back fastest line between stations from a table of
+    all shortest paths, computed once with Dijkstra's algorithm
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import heapq
+import os
+import numpy as np
+
+from code.classes import Line
+
+
+class Shortest_Paths():
+    """
+    the Shortest_Paths class keeps a table of the shortest durations and
+        paths between all stations, the path between two stations is rebuilt
+        from the table in O(path length), only the rows of the stations used
+        as a source are kept
+
+    parameters:
+        connections     - all connections that can be used in a line;
+        max_duration    - maximal duration of the line in minutes;
+        cache_file      - .npz file to load/save the table (default None);
+
+    properties:
+        distances   - returns the shortest duration between all stations;
+        previous    - returns the last connection id on each shortest path;
+
+    methods:
+        dijkstra        - computes the shortest paths from one station;
+        compute_all     - computes the shortest paths from all stations;
+        load            - loads the table from the cache file;
+        save            - saves the table to the cache file;
+        path            - returns the connection ids between two stations;
+        create_line     - returns shortest line between two stations;
+    """
+
+    def __init__(self, connections, max_duration, cache_file=None):
+        """
+        initialize Shortest_Paths
+
+        parameters:
+            connections     - all connections that can be used in a line;
+            max_duration    - maximal duration of the line in minutes;
+            cache_file      - .npz file to load/save the table
+                (default None);
+        """
+
+        self._connections = connections
+        self._max_duration = max_duration
+        self._graph = connections[0].graph
+        self._cache_file = cache_file
+
+        # keep the graph as lists, these are faster to index one by one
+        self._indptr = self._graph.indptr.tolist()
+        self._neighbours = self._graph.neighbours.tolist()
+        self._edges = self._graph.edges.tolist()
+        self._starts = self._graph.starts.tolist()
+        self._ends = self._graph.ends.tolist()
+        self._durations = self._graph.durations.tolist()
+
+        # predefine table, rows are computed when first needed and kept by
+        #   source as distances and previous connections
+        self._rows = dict()
+
+        # compute the whole table at once if it should be cached
+        if cache_file:
+            if os.path.isfile(cache_file):
+                self.load()
+            else:
+                self.compute_all()
+                self.save()
+
+    @property
+    def distances(self):
+        """
+        returns the shortest duration between all stations
+        """
+
+        self.compute_all()
+
+        return np.array([self._rows[sid][0]
+                         for sid in range(self._graph.n_of_stations)])
+
+    @property
+    def previous(self):
+        """
+        returns the last connection id on each shortest path
+            (-1 if there is no path)
+        """
+
+        self.compute_all()
+
+        return np.array([self._rows[sid][1]
+                         for sid in range(self._graph.n_of_stations)])
+
+    def dijkstra(self, source):
+        """
+        computes the shortest paths from one station to all stations
+
+        parameter:
+            source - station id to start from;
+        """
+
+        # predefine durations and last connections of the paths
+        distances = [float("inf")] * self._graph.n_of_stations
+        previous = [-1] * self._graph.n_of_stations
+        distances[source] = 0.
+
+        # expand the closest station first
+        queue = [(0., source)]
+        while queue:
+            distance, sid = heapq.heappop(queue)
+
+            # skip stations that have been reached faster already
+            if distance > distances[sid]:
+                continue
+
+            # relax all connections of this station
+            for i in range(self._indptr[sid], self._indptr[sid + 1]):
+                neighbour = self._neighbours[i]
+                new_distance = distance + self._durations[self._edges[i]]
+
+                if new_distance < distances[neighbour]:
+                    distances[neighbour] = new_distance
+                    previous[neighbour] = self._edges[i]
+                    heapq.heappush(queue, (new_distance, neighbour))
+
+        # save the row in the table
+        self._rows[source] = (np.array(distances),
+                              np.array(previous, dtype=np.int32))
+
+    def compute_all(self):
+        """
+        computes the shortest paths from all stations not computed yet
+        """
+
+        for source in range(self._graph.n_of_stations):
+            if source not in self._rows:
+                self.dijkstra(source)
+
+    def load(self):
+        """
+        loads the table from the cache file, recomputes the table if the
+            cache file belongs to another graph
+        """
+
+        cache = np.load(self._cache_file)
+
+        # make sure the cache is for this graph
+        if str(cache["fingerprint"]) != self._graph.fingerprint:
+            print(f"{self._cache_file} is outdated, recomputing")
+            self.compute_all()
+            self.save()
+            return
+
+        self._rows = {sid: row for sid, row
+                      in enumerate(zip(cache["distances"],
+                                       cache["previous"]))}
+
+    def save(self):
+        """
+        saves the table to the cache file, it's written to a temporary file
+            first so workers saving at the same time can't mix their tables
+        """
+
+        temporary_file = f"{self._cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            np.savez(file, fingerprint=self._graph.fingerprint,
+                     distances=self.distances, previous=self.previous)
+        os.replace(temporary_file, self._cache_file)
+
+    def path(self, sid1, sid2):
+        """
+        returns the connection ids of the shortest path between two stations
+
+        parameters:
+            sid1 - station id where the path starts;
+            sid2 - station id where the path is going to;
+
+        returns list of connection ids or None if there is no path
+        """
+
+        # make sure the paths from sid1 are known
+        if sid1 not in self._rows:
+            self.dijkstra(sid1)
+        distances, previous = self._rows[sid1]
+
+        # there is no path if sid2 can't be reached
+        if np.isinf(distances[sid2]):
+            return None
+
+        # walk back from sid2 to sid1 over the last connections
+        path = []
+        sid = sid2
+        while sid != sid1:
+            cid = int(previous[sid])
+            path.append(cid)
+            sid = self._starts[cid] if self._ends[cid] == sid \
+                else self._ends[cid]
+
+        path.reverse()
+
+        return path
+
+    def create_line(self, station1, station2):
+        """
+        Returns line between two stations with the shortest duration
+
+        parameters:
+            station1    - station where the line starts;
+            station2    - station where the line is going to;
+
+        returns a line between the two stations or None if there is no line
+            within the max duration
+        """
+
+        # find the shortest path
+        path = self.path(station1.sid, station2.sid)
+
+        # make sure there is a path and it is short enough
+        if path is None or \
+                self._rows[station1.sid][0][station2.sid] > \
+                self._max_duration:
+            return None
+
+        # rebuild the line from the path
+        line = Line(station1)
+        for cid in path:
+            line.add_connection(self._connections[cid], self._max_duration)
+
+        return line
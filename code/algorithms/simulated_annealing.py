@@ -1,6 +1,6 @@
 """
 version: python 3.8
-hill_climber.py defines the Hill Climbing algorithm
+simulated_annealing.py defines the Simulated Annealing algorithm
 
 authors:
     Dani van Enk, 11823526
@@ -9,11 +9,18 @@ authors:
 
 
 # used imports
-import random as rd
-import copy
+import time
 import progressbar as pbar
 
 from code.algorithms import Hill_Climber
+from code.classes import Top_Results, Operator_Stats, Geometric_Cooling, \
+    Linear_Cooling, Logarithmic_Cooling, Adaptive_Cooling
+
+# cooling schedules by name
+cooling_schedules = {"geometric": Geometric_Cooling,
+                     "linear": Linear_Cooling,
+                     "logarithmic": Logarithmic_Cooling,
+                     "adaptive": Adaptive_Cooling}
 
 
 class Simulated_Annealing(Hill_Climber):
@@ -25,14 +32,52 @@ class Simulated_Annealing(Hill_Climber):
         connections     - connections in database;
         max_duration    - maximal duration for a line
         max_n_of_l      - maximal number of lines;
+        history_every   - keep one of every n scores in memory (default 1);
+        history_file    - csv file to stream all scores to (default None);
+        seed            - seed or random.Random to use (default None);
+        time_limit      - max no. of seconds of a run, shared by the
+                            repeats (default None);
+        checkpoint_file - file to save checkpoints to (default None);
+        checkpoint_every
+                        - no. of seconds between checkpoints (default 60);
+        start           - lines to start from (none to set them later with
+                            set_state), a saved solution file or
+                            random/greedy to create them (default random);
+        start_runs      - no. of random/greedy runs to take the best start
+                            from (default 1);
+        schedule        - cooling schedule, geometric, linear, logarithmic or
+                            adaptive (default geometric);
+        start_temperature
+                        - temperature at the start of a run (default the
+                            score of one connection);
+        end_temperature - temperature at the end of a run (default
+                            start_temperature / 1000);
+        reheats         - no. of times to reheat a run when it stagnates
+                            (default 0);
+        stagnation      - no. of iterations without a better score before a
+                            run is reheated or stopped (default never);
+        paths_file      - .npz file to cache the shortest paths in
+                            (default None);
+
+    properties:
+        schedule    - returns the cooling schedule;
 
     methods:
-        temperature         - temperature for this iteration;
+        temperature         - temperature for this progress of the run;
         acceptation_chance  - calc accept chance from score diff and temp;
+        step                - tries to change the current state once;
+        run_chain           - runs a chain at a fixed temperature;
+        checkpoint          - returns the state to continue from;
+        restore             - continues from a checkpoint;
         run                 - runs algorithm for specified values;
     """
 
-    def __init__(self, connections, max_duration, max_n_of_l):
+    def __init__(self, connections, max_duration, max_n_of_l,
+                 history_every=1, history_file=None, seed=None,
+                 time_limit=None, checkpoint_file=None, checkpoint_every=60,
+                 start="random", start_runs=1, schedule="geometric",
+                 start_temperature=None, end_temperature=None, reheats=0,
+                 stagnation=None, paths_file=None):
         """
         Initializes the Simulated Annealing Algorithm
 
@@ -40,23 +85,87 @@ class Simulated_Annealing(Hill_Climber):
             connections     - connections in database;
             max_duration    - maximal duration for a line
             max_n_of_l      - maximal number of lines;
+            history_every   - keep one of every n scores in memory
+                (default 1);
+            history_file    - csv file to stream all scores to
+                (default None);
+            seed            - seed or random.Random to use
+                (default None);
+            time_limit      - max no. of seconds of a run, shared by the
+                repeats, it then cools down over the time (default None);
+            checkpoint_file - file to save checkpoints to, a run can be
+                continued from it with load_checkpoint (default None);
+            checkpoint_every
+                            - no. of seconds between checkpoints
+                (default 60);
+            start           - lines to start from (none to set them later
+                with set_state), a file saved with save_solution or
+                random/greedy to create them (default random);
+            start_runs      - no. of random/greedy runs to take the best
+                start from (default 1);
+            schedule        - cooling schedule, geometric, linear,
+                logarithmic or adaptive (default geometric);
+            start_temperature
+                            - temperature at the start of a run (default
+                the score of one connection);
+            end_temperature - temperature at the end of a run (default
+                start_temperature / 1000);
+            reheats         - no. of times to reheat a run when it stagnates
+                (default 0);
+            stagnation      - no. of iterations without a better score
+                before a run is reheated or stopped (default never);
+            paths_file      - .npz file to cache the shortest paths in, so
+                they are only computed once per network (default None);
         """
 
         # init Simulated Annealing from inheritance
-        super().__init__(connections, max_duration, max_n_of_l)
+        super().__init__(connections, max_duration, max_n_of_l,
+                         history_every, history_file, seed, time_limit,
+                         checkpoint_file, checkpoint_every, start,
+                         start_runs, paths_file)
 
-    def temperature(self, startT, iteration):
+        # make sure the schedule exists
+        if schedule not in cooling_schedules:
+            exit("Simulated_AnnealingInitError: schedule should be one of "
+                 f"{', '.join(cooling_schedules)}")
+
+        # make sure reheats and stagnation are integers
+        try:
+            self._reheats = int(reheats)
+            self._stagnation = int(stagnation) if stagnation else None
+            assert self._reheats >= 0
+        except (AssertionError, ValueError):
+            exit("Simulated_AnnealingInitError: please make sure reheats "
+                 "and stagnation are positive integers")
+
+        # by default a lost connection is accepted half the time at the start
+        if start_temperature is None:
+            start_temperature = 10000 / len(connections)
+        if end_temperature is None:
+            end_temperature = float(start_temperature) / 1000
+
+        self._schedule = cooling_schedules[schedule](start_temperature,
+                                                     end_temperature)
+
+    @property
+    def schedule(self):
+        """
+        returns the cooling schedule
         """
-        temperature for this iteration
 
-        parameters:
-            startT      - starting temperature;
-            iteration   - current iteration;
+        return self._schedule
+
+    def temperature(self, progress):
+        """
+        temperature for this progress of the run
+
+        parameter:
+            progress    - progress of the run (0 at the start, 1 at the end);
 
         returns the temperature
         """
 
-        return startT * .997 ** iteration
+        return self._schedule.temperature(progress)
 
     def acceptation_chance(self, old_score, new_score, temperature):
         """
@@ -68,88 +177,231 @@ class Simulated_Annealing(Hill_Climber):
             temperature - current temperature
         """
 
-        return 2**((old_score - new_score)/temperature)
+        # always accept improvements, never accept worse without temperature
+        if new_score >= old_score:
+            return 1
+        elif temperature <= 0:
+            return 0
+
+        return 2**((new_score - old_score)/temperature)
+
+    def step(self, temperature):
+        """
+        tries to change the current state once at a temperature
+
+        parameter:
+            temperature - temperature to accept the change at;
+
+        returns if the change is accepted, None if no change is proposed
+        """
+
+        # choose random line to change and propose a change
+        line_index = self._rng.randint(0, len(self._current_state[0]) - 1)
+        old_score = self._current_state[1]
+        move = self.propose(line_index)
+
+        # skip lines no option can change
+        if not move:
+            return None
+
+        option, lines, score, start = move
+
+        # get the current chance
+        chance = self.acceptation_chance(old_score, score[0], temperature)
+
+        # accept if score is higher than old score or chance is right
+        #   else undo score update
+        accepted = score[0] > old_score or self._rng.random() < chance
+        if accepted:
+            self._current_state = (lines,) + score
+
+            # add new state to results attribute
+            self._result.add(self._current_state)
+        else:
+            self.revert_score(lines, line_index)
+
+        # keep the stats and reward of the option
+        seconds = time.perf_counter() - start
+        self._stats.record(option.__name__, accepted, seconds,
+                           score[0] - old_score)
+        self._scheduler.update(option, score[0] - old_score, seconds)
+
+        return accepted
+
+    def run_chain(self, lines, temperature, iterations, rewards=None):
+        """
+        runs a chain at a fixed temperature starting from the given lines,
+            the results and operator stats start fresh and the scheduler
+            continues with the given rewards, so a chain only depends on its
+            lines, rewards and the random state
+
+        parameters:
+            lines       - lines to start from;
+            temperature - temperature of the chain;
+            iterations  - number of tries to change the state;
+            rewards     - operator rewards to continue with, None to start
+                            fresh (default None);
+
+        returns the final state and the best results of the chain
+        """
+
+        # start from the lines with fresh results and stats
+        self.set_state(lines)
+        self._result = Top_Results()
+        self._result.add(self._current_state)
+        self._stats = Operator_Stats()
+
+        # continue learning which operators pay off at this temperature
+        if rewards is None:
+            self._scheduler.reset()
+        else:
+            self._scheduler.rewards = rewards
+
+        for _ in range(iterations):
+            self.step(temperature)
+
+        return self._current_state, self._result.results
+
+    def checkpoint(self, run, iteration, **run_state):
+        """
+        returns the state to continue from, including the cooling schedule
+
+        parameters:
+            run         - run to continue;
+            iteration   - iteration to continue from;
+            run_state   - other variables of the run;
+        """
+
+        return dict(super().checkpoint(run, iteration, **run_state),
+                    schedule=self._schedule)
+
+    def restore(self, checkpoint):
+        """
+        continues from a checkpoint, including the cooling schedule
+
+        parameter:
+            checkpoint - state to continue from (see checkpoint);
+        """
+
+        super().restore(checkpoint)
 
-    def run(self, repeat=1, iterations=1):
+        self._schedule = checkpoint["schedule"]
+
+    def run(self, repeat=1, iterations=1, progress_bar=True):
         """
         run this algorithm
 
         parameters:
-            repeat      - number of times to repeat the algorithm (default 1);
-            iterations  - number of tries to change the current state
+            repeat          - number of times to repeat the algorithm
                 (default 1);
+            iterations      - number of tries to change the current state,
+                None to run until the time limit (default 1);
+            progress_bar    - do I need to show the progress? (default True);
+
+        returns the result
         """
 
-        # make sure iterations and repeat are integers
+        # make sure iterations and repeat are integers, or the time limited
         try:
             int(repeat)
-            int(iterations)
-        except ValueError:
+            assert iterations is not None or self._time_limit
+            iterations = int(iterations) if iterations is not None else None
+        except (AssertionError, ValueError):
             exit("RunError: please make sure you've entered a integer "
                  "for the number of repeats and iterations")
 
-        # print running paramters
-        print(f"Runing, Simulated Annealing {repeat} times with "
-              f"{iterations} iterations per run")
-
-        # define the progressbar widgets
-        bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
-
-        # define the progress bar and start it
-        bar = pbar.ProgressBar(maxval=repeat*iterations,
-                               widgets=bar_widgets).start()
-
-        # repeat the algorithm as many times as specified
-        for run in range(repeat):
-            # loop for each iteration
-            for iteration in range(iterations):
-
-                # create a copy of the current state
-                state = copy.deepcopy(self._current_state)
-
-                # define options
-                options = [self.ends_cut, self.add_missing,
-                           self.remove_duplicates, self.change_line_section]
+        # make sure there are lines to change
+        if not self._current_state[0]:
+            exit("RunError: please make sure there are lines to start from, "
+                 "an empty start has to be set with set_state")
 
-                # define lines (from state)
-                lines = state[0]
+        # show progress bar
+        if progress_bar:
 
-                # choose random option
-                new_lines = rd.choice(options)(lines)
+            # print running paramters
+            budget = f"{iterations} iterations" if iterations is not None \
+                else f"{self._time_limit / repeat:g} seconds"
+            print(f"Runing, Simulated Annealing {repeat} times with "
+                  f"{budget} per run")
 
-                # make sure option worked
-                if new_lines:
-                    lines = new_lines
+            # define the progressbar widgets
+            bar_widgets = [pbar.Bar("#", "[", "]"), " ", pbar.ETA()]
 
-                # get new score
-                score = self.goal_function(lines)
+            # define the progress bar and start it, it counts the runs
+            bar = pbar.ProgressBar(maxval=repeat,
+                                   widgets=bar_widgets).start()
 
-                # starting temperature, to be decided
-                startT = iterations
+        # continue from a checkpoint, if loaded
+        start_run, start_iteration, run_state = self._resumed
+        self._resumed = (0, 0, dict())
 
-                # get the current chance
-                chance = self.acceptation_chance(self._current_state[1],
-                                                 score[0],
-                                                 self.temperature(startT,
-                                                                  iteration))
+        # repeat the algorithm as many times as specified
+        for run in range(start_run, repeat):
+
+            # each run gets an equal share of the time
+            self.set_deadline(self._time_limit and self._time_limit / repeat)
+
+            # start cooling and keep track of when the run stagnates, or
+            #   continue the cooling of the checkpoint
+            if run == start_run and run_state:
+                reheats = run_state["reheats"]
+                best_score = run_state["best_score"]
+                last_improvement = run_state["last_improvement"]
+            else:
+                self._schedule.reset()
+                reheats = self._reheats
+                best_score = self._current_state[1]
+                last_improvement = 0
+                start_iteration = 0
 
-                # accept if score is higher than old score or chance is right
-                if score[0] > self._current_state[1] or rd.random() < chance:
-                    self._current_state = (lines,) + score
+            # loop for each iteration
+            for iteration in self.iterate(iterations, start_iteration):
 
-                # add result to results attribute and save score/iterations
-                self._result.append(self._current_state)
-                self._scores[run]["iterations"].append(iteration)
-                self._scores[run]["scores"].append(self._current_state[1])
+                # try to change the state at the current temperature, it
+                #   cools down over the iterations or the time
+                progress = self.run_progress(iteration, iterations)
+                accepted = self.step(self.temperature(progress))
+                if accepted is not None:
+                    self._schedule.update(accepted)
 
-                # save the 5 best results
-                self._result = sorted(self._result, key=lambda x: x[1],
-                                      reverse=True)[:5]
+                # save score/iterations
+                self._scores.record(run, iterations=iteration,
+                                    scores=self._current_state[1])
 
                 # update progress bar
-                bar.update(run*iterations + iteration + 1)
+                if progress_bar:
+                    bar.update(run + self.run_progress(iteration + 1,
+                                                       iterations))
+
+                # remember when the best score of this run improved
+                if self._current_state[1] > best_score:
+                    best_score = self._current_state[1]
+                    last_improvement = iteration
+
+                # reheat a stagnating run, or stop it when out of reheats
+                elif self._stagnation and \
+                        iteration - last_improvement >= self._stagnation:
+                    if not reheats:
+                        break
+
+                    self._schedule.reheat(progress)
+                    reheats -= 1
+                    last_improvement = iteration
+
+                # save a checkpoint every so many seconds
+                if self._checkpoint_file and \
+                        time.perf_counter() >= self._next_checkpoint:
+                    self.save_checkpoint(run, iteration + 1, reheats=reheats,
+                                         best_score=best_score,
+                                         last_improvement=last_improvement)
 
         # finish progress bar
-        bar.finish()
+        if progress_bar:
+            bar.finish()
+
+        # save the final state, write the streamed scores and close the csv
+        if self._checkpoint_file:
+            self.save_checkpoint(repeat, 0)
+        self._scores.close()
 
-        return self._result
+        return self._result.results
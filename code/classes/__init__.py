@@ -2,3 +2,12 @@ from .station_class import Station
 from .connection_class import Connection
 from .line_class import Line
 from .arg_class import Arg
+from .score_class import Score
+from .graph_class import Graph
+from .top_results_class import Top_Results
+from .score_history_class import Score_History
+from .connection_pool_class import Connection_Pool
+from .operator_stats_class import Operator_Stats
+from .operator_scheduler_class import Operator_Scheduler
+from .cooling_schedule_class import Cooling_Schedule, Geometric_Cooling, \
+    Linear_Cooling, Logarithmic_Cooling, Adaptive_Cooling
@@ -16,7 +16,8 @@ class Arg():
         aliases         - all aliases for this argument;
         description     - description of this argument;
         optional        - is this argument optional (default False);
-        argument_type   - argument type (default str);
+        argument_type   - argument type, str, int, float or flag
+                            (default str);
 
     properties:
         aliases         - returns the aliases of this argument;
@@ -37,7 +38,8 @@ class Arg():
             aliases         - all aliases for this argument;
             description     - description of this argument;
             optional        - is this argument optional (default False);
-            argument_type   - argument type (default str);
+            argument_type   - argument type, str, int, float or flag
+                (default str);
         """
 
         self._aliases = aliases
@@ -84,12 +86,21 @@ class Arg():
         sets the value and converts it to it's correct type
         """
 
+        # a flag is set when it's given, it takes no value
+        if self._argument_type == "flag":
+            self._value = True
         # if argument is of type int make sure value becomes int
-        if self._argument_type == "int":
+        elif self._argument_type == "int":
             try:
                 self._value = int(value)
             except ValueError:
                 exit("value is not a integer")
+        # if argument is of type float make sure value becomes float
+        elif self._argument_type == "float":
+            try:
+                self._value = float(value)
+            except ValueError:
+                exit("value is not a number")
         # else keep it as the value given
         else:
             self._value = value
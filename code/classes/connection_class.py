@@ -19,11 +19,15 @@ class Connection():
         start       - starting station;
         end         - end station;
         duration    - duration between stations;
+        graph       - graph this connection is a view on (default None);
+        cid         - connection id in the graph (default None);
 
     properties:
         duration    - returns the duration between stations;
             setter condition: duration of more than 0
         section     - returns the start and end stations;
+        cid         - returns the connection id;
+        graph       - returns the graph this connection is a view on;
 
     method:
         other - get other station in connection;
@@ -32,7 +36,7 @@ class Connection():
     # define general unique identifier
     guid = 0
 
-    def __init__(self, start, end, duration):
+    def __init__(self, start, end, duration, graph=None, cid=None):
         """
         initialize a Connection
 
@@ -40,7 +44,8 @@ class Connection():
             start       - starting station;
             end         - end station;
             duration    - duration between stations;
-            cid         - return the connection id;
+            graph       - graph this connection is a view on (default None);
+            cid         - connection id in the graph (default None);
         """
 
         # make sure start and end are of Station type and duration is a number
@@ -51,14 +56,27 @@ class Connection():
             exit("ConnectionInitError: please make sure the start and end "
                  "parameters are a Station object\n and duration is a number")
 
-        # define start, end and duration attributes
+        # define start, end and graph attributes
         self._start = start
         self._end = end
-        self._duration = duration
-        self._id = self.guid
+        self._graph = graph
+
+        # the duration and id are defined by the graph if there is one, the
+        #   duration is kept as a float as well so reading it stays cheap
+        if graph is not None:
+            try:
+                assert 0 <= int(cid) < graph.n_of_connections
+            except (AssertionError, TypeError, ValueError):
+                exit("ConnectionInitError: please make sure cid is a "
+                     "connection id in the graph")
+            self._id = int(cid)
+            self._duration = float(graph.durations[self._id])
+        else:
+            self._duration = duration
+            self._id = self.guid
 
-        # increase general unique identifier
-        Connection.guid += 1
+            # increase general unique identifier
+            Connection.guid += 1
 
         # add connection to start and end stations
         start.add_connection(self)
@@ -84,8 +102,11 @@ class Connection():
         # make sure duration is bigger than 0
         if duration < 0:
             raise ValueError(f"{duration} is smaller than 0")
-        else:
-            self._duration = duration
+
+        # keep the graph up to date as well
+        if self._graph is not None:
+            self._graph.durations[self._id] = duration
+        self._duration = float(duration)
 
     @property
     def section(self):
@@ -103,13 +124,21 @@ class Connection():
 
         return self._id
 
+    @property
+    def graph(self):
+        """
+        return the graph this connection is a view on
+        """
+
+        return self._graph
+
     def __repr__(self):
         """
         return the correct representation of the Connection class
         """
 
         return f"Section: {self._start} - {self._end} " \
-               f"(Duration: {self._duration})"
+               f"(Duration: {self.duration})"
 
     def __str__(self):
         """
@@ -0,0 +1,86 @@
+"""
+version: python 3.8
+connection_pool_class.py defines the Connection_Pool class used to keep
+    the connections that can still be used
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import random as rd
+
+
+class Connection_Pool():
+    """
+    the Connection_Pool class keeps a pool of connections keyed by
+        connection id, membership, removal and random choice are all O(1)
+
+    parameters:
+        connections - connections to start the pool with;
+
+    properties:
+        connections - returns the connections in the pool (in no order);
+
+    methods:
+        remove  - removes a connection from the pool;
+        choice  - returns a random connection from the pool;
+    """
+
+    def __init__(self, connections):
+        """
+        initialize the Connection_Pool
+
+        parameter:
+            connections - connections to start the pool with;
+        """
+
+        # keep the connections in a list and their index per connection id
+        self._connections = list(connections)
+        self._index = {connection.cid: index
+                       for index, connection in enumerate(self._connections)}
+
+    @property
+    def connections(self):
+        """
+        returns the connections in the pool (in no order)
+        """
+
+        return self._connections
+
+    def remove(self, connection):
+        """
+        removes a connection from the pool by swapping it with the last one
+
+        parameter:
+            connection - connection to be removed;
+        """
+
+        # make sure the connection is in the pool
+        try:
+            index = self._index.pop(connection.cid)
+        except KeyError:
+            exit("Connection_PoolRemoveError: connection not in pool")
+
+        # move the last connection to the place of the removed one
+        last = self._connections.pop()
+        if index < len(self._connections):
+            self._connections[index] = last
+            self._index[last.cid] = index
+
+    def choice(self, rng=rd):
+        """
+        returns a random connection from the pool
+
+        parameter:
+            rng - random number generator to use (default random module);
+        """
+
+        return rng.choice(self._connections)
+
+    def __contains__(self, connection):
+        return connection.cid in self._index
+
+    def __len__(self):
+        return len(self._connections)
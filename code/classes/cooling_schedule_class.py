@@ -0,0 +1,282 @@
+"""
+version: python 3.8
+cooling_schedule_class.py defines the Cooling_Schedule classes used to give
+    the temperature of Simulated_Annealing as a function of the progress of
+    a run (0 at the start, 1 at the end)
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import math
+
+from abc import ABC, abstractmethod
+
+
+class Cooling_Schedule(ABC):
+    """
+    the Cooling_Schedule class is the abstract base of the cooling
+        schedules, it cools from the start to the end temperature over a run
+        and can be reheated to cool down again over the rest of the run, a
+        schedule has to define cool
+
+    parameters:
+        start_temperature   - temperature at the start of a run;
+        end_temperature     - temperature at the end of a run;
+
+    properties:
+        start_temperature   - returns the temperature at the start of a run;
+        end_temperature     - returns the temperature at the end of a run;
+
+    methods:
+        cool        - returns the temperature at a fraction of the cooling;
+        temperature - returns the temperature at a progress of the run;
+        update      - updates the schedule with an accepted/rejected move;
+        reheat      - restarts the cooling from the current progress;
+        reset       - restarts the cooling for a new run;
+    """
+
+    def __init__(self, start_temperature, end_temperature):
+        """
+        initialize the Cooling_Schedule
+
+        parameters:
+            start_temperature   - temperature at the start of a run;
+            end_temperature     - temperature at the end of a run;
+        """
+
+        # make sure the schedule cools down from a positive temperature
+        try:
+            start_temperature = float(start_temperature)
+            end_temperature = float(end_temperature)
+            assert start_temperature >= end_temperature > 0
+        except (AssertionError, ValueError):
+            exit("Cooling_ScheduleInitError: please make sure the start "
+                 "temperature is at least the end temperature and both are "
+                 "positive numbers")
+
+        self._start_temperature = start_temperature
+        self._end_temperature = end_temperature
+
+        # progress of the run at the last reheat
+        self._reheated = 0.
+
+    @property
+    def start_temperature(self):
+        """
+        returns the temperature at the start of a run
+        """
+
+        return self._start_temperature
+
+    @property
+    def end_temperature(self):
+        """
+        returns the temperature at the end of a run
+        """
+
+        return self._end_temperature
+
+    @abstractmethod
+    def cool(self, fraction):
+        """
+        returns the temperature at a fraction of the cooling
+
+        parameter:
+            fraction - fraction of the cooling (0 at the start, 1 at the end);
+        """
+
+    def temperature(self, progress):
+        """
+        returns the temperature at a progress of the run, the cooling starts
+            again at the last reheat
+
+        parameter:
+            progress - progress of the run (0 at the start, 1 at the end);
+        """
+
+        # the fraction of the cooling since the last reheat
+        if progress >= 1:
+            fraction = 1.
+        else:
+            fraction = (progress - self._reheated) / (1 - self._reheated)
+
+        return self.cool(min(max(fraction, 0.), 1.))
+
+    def update(self, accepted):
+        """
+        updates the schedule with an accepted/rejected move
+
+        parameter:
+            accepted - if the move is accepted;
+        """
+
+        pass
+
+    def reheat(self, progress):
+        """
+        restarts the cooling from the start temperature at this progress,
+            it then cools down over the rest of the run
+
+        parameter:
+            progress - progress of the run (0 at the start, 1 at the end);
+        """
+
+        self._reheated = min(max(progress, 0.), 1.)
+
+    def reset(self):
+        """
+        restarts the cooling for a new run
+        """
+
+        self.reheat(0.)
+
+
+class Geometric_Cooling(Cooling_Schedule):
+    """
+    the Geometric_Cooling class multiplies the temperature by the same
+        factor every step
+    """
+
+    def cool(self, fraction):
+        """
+        returns the temperature at a fraction of the cooling
+
+        parameter:
+            fraction - fraction of the cooling (0 at the start, 1 at the end);
+        """
+
+        return self._start_temperature * \
+            (self._end_temperature / self._start_temperature) ** fraction
+
+
+class Linear_Cooling(Cooling_Schedule):
+    """
+    the Linear_Cooling class lowers the temperature by the same amount every
+        step
+    """
+
+    def cool(self, fraction):
+        """
+        returns the temperature at a fraction of the cooling
+
+        parameter:
+            fraction - fraction of the cooling (0 at the start, 1 at the end);
+        """
+
+        return self._start_temperature + \
+            (self._end_temperature - self._start_temperature) * fraction
+
+
+class Logarithmic_Cooling(Cooling_Schedule):
+    """
+    the Logarithmic_Cooling class lowers the temperature by the logarithm of
+        the steps, fast at the start and slow at the end
+    """
+
+    def cool(self, fraction):
+        """
+        returns the temperature at a fraction of the cooling
+
+        parameter:
+            fraction - fraction of the cooling (0 at the start, 1 at the end);
+        """
+
+        return self._start_temperature * self._end_temperature / \
+            (self._end_temperature + (self._start_temperature -
+                                      self._end_temperature) *
+             math.log(1 + (math.e - 1) * fraction))
+
+
+class Adaptive_Cooling(Cooling_Schedule):
+    """
+    the Adaptive_Cooling class steers the temperature to an acceptance rate
+        that goes down linearly over the run, it heats up when too few moves
+        are accepted and cools down when too many are
+
+    parameters:
+        start_temperature   - temperature at the start of a run;
+        end_temperature     - lowest temperature;
+        start_rate          - acceptance rate at the start (default 0.5);
+        end_rate            - acceptance rate at the end (default 0.01);
+        window              - no. of moves to average the rate over
+                                (default 100);
+        step                - factor to change the temperature by
+                                (default 1.01);
+    """
+
+    def __init__(self, start_temperature, end_temperature, start_rate=.5,
+                 end_rate=.01, window=100, step=1.01):
+        """
+        initialize the Adaptive_Cooling
+
+        parameters:
+            start_temperature   - temperature at the start of a run;
+            end_temperature     - lowest temperature;
+            start_rate          - acceptance rate at the start (default 0.5);
+            end_rate            - acceptance rate at the end (default 0.01);
+            window              - no. of moves to average the rate over
+                (default 100);
+            step                - factor to change the temperature by
+                (default 1.01);
+        """
+
+        super().__init__(start_temperature, end_temperature)
+
+        self._start_rate = start_rate
+        self._end_rate = end_rate
+        self._window = window
+        self._step = step
+
+        # current temperature and running mean of the acceptance
+        self._temperature = self._start_temperature
+        self._rate = start_rate
+
+    def cool(self, fraction):
+        """
+        returns the temperature at a fraction of the cooling
+
+        parameter:
+            fraction - fraction of the cooling (0 at the start, 1 at the end);
+        """
+
+        # the acceptance rate aimed for at this fraction
+        target = self._start_rate + (self._end_rate - self._start_rate) * \
+            fraction
+
+        # heat up if too few moves are accepted, else cool down
+        if self._rate < target:
+            self._temperature *= self._step
+        else:
+            self._temperature /= self._step
+
+        self._temperature = min(max(self._temperature,
+                                    self._end_temperature),
+                                self._start_temperature)
+
+        return self._temperature
+
+    def update(self, accepted):
+        """
+        updates the acceptance rate with an accepted/rejected move
+
+        parameter:
+            accepted - if the move is accepted;
+        """
+
+        self._rate += (accepted - self._rate) / self._window
+
+    def reheat(self, progress):
+        """
+        restarts the cooling from the start temperature at this progress
+
+        parameter:
+            progress - progress of the run (0 at the start, 1 at the end);
+        """
+
+        super().reheat(progress)
+
+        self._temperature = self._start_temperature
+        self._rate = self._start_rate
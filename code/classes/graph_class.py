@@ -0,0 +1,242 @@
+"""
+version: python 3.8
+graph_class.py defines the Graph class, the array backed core of the database
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import hashlib
+import numpy as np
+
+
+class Graph():
+    """
+    the Graph class defines the network of stations and connections as
+        integer indexed arrays with a CSR (compressed sparse row) adjacency,
+        Station and Connection objects are views on this graph
+
+    parameters:
+        names       - names of the stations, the index is the station id;
+        latitudes   - latitude positions of the stations;
+        longitudes  - longitude positions of the stations;
+        starts      - start station id of each connection, the index is the
+                        connection id;
+        ends        - end station id of each connection;
+        durations   - duration of each connection;
+
+    properties:
+        n_of_stations       - returns the number of stations;
+        n_of_connections    - returns the number of connections;
+        names               - returns the station names;
+        latitudes           - returns the station latitudes;
+        longitudes          - returns the station longitudes;
+        starts              - returns the start station id per connection;
+        ends                - returns the end station id per connection;
+        durations           - returns the duration per connection;
+        indptr              - returns the CSR row pointers per station;
+        neighbours          - returns the CSR neighbouring station ids;
+        edges               - returns the CSR connection ids;
+        fingerprint         - returns a hash identifying this graph;
+
+    methods:
+        station_id      - returns the station id of a station name;
+        adjacent        - returns the neighbours and connections of a station;
+        other           - returns the other station id of a connection;
+    """
+
+    def __init__(self, names, latitudes, longitudes, starts, ends, durations):
+        """
+        initialize a Graph
+
+        parameters:
+            names       - names of the stations, the index is the station id;
+            latitudes   - latitude positions of the stations;
+            longitudes  - longitude positions of the stations;
+            starts      - start station id of each connection;
+            ends        - end station id of each connection;
+            durations   - duration of each connection;
+        """
+
+        # make sure the positions and durations are numbers
+        try:
+            self._latitudes = np.asarray(latitudes, dtype=np.float64)
+            self._longitudes = np.asarray(longitudes, dtype=np.float64)
+            self._starts = np.asarray(starts, dtype=np.int32)
+            self._ends = np.asarray(ends, dtype=np.int32)
+            self._durations = np.asarray(durations, dtype=np.float64)
+        except ValueError:
+            exit("GraphInitError: please make sure lat/long and durations are "
+                 "numbers and starts/ends are station ids")
+
+        # define names and the name to station id lookup
+        self._names = list(names)
+        self._station_ids = {name: sid for sid, name in enumerate(names)}
+
+        # make sure every station and connection is defined once
+        if len(self._station_ids) != len(self._names) or \
+                len(self._latitudes) != len(self._names) or \
+                len(self._longitudes) != len(self._names):
+            exit("GraphInitError: please make sure every station has a "
+                 "unique name and a position")
+        if not len(self._starts) == len(self._ends) == len(self._durations):
+            exit("GraphInitError: please make sure every connection has a "
+                 "start, end and duration")
+
+        # each connection is adjacent to both of its stations
+        sources = np.concatenate((self._starts, self._ends))
+        targets = np.concatenate((self._ends, self._starts))
+        cids = np.tile(np.arange(len(self._starts), dtype=np.int32), 2)
+
+        # sort the adjacency by source station to get the CSR arrays
+        order = np.argsort(sources, kind="stable")
+        self._neighbours = targets[order]
+        self._edges = cids[order]
+        self._indptr = np.zeros(len(self._names) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=len(self._names)),
+                  out=self._indptr[1:])
+
+    @property
+    def n_of_stations(self):
+        """
+        returns the number of stations
+        """
+
+        return len(self._names)
+
+    @property
+    def n_of_connections(self):
+        """
+        returns the number of connections
+        """
+
+        return len(self._durations)
+
+    @property
+    def names(self):
+        """
+        returns the station names
+        """
+
+        return self._names
+
+    @property
+    def latitudes(self):
+        """
+        returns the station latitudes
+        """
+
+        return self._latitudes
+
+    @property
+    def longitudes(self):
+        """
+        returns the station longitudes
+        """
+
+        return self._longitudes
+
+    @property
+    def starts(self):
+        """
+        returns the start station id per connection
+        """
+
+        return self._starts
+
+    @property
+    def ends(self):
+        """
+        returns the end station id per connection
+        """
+
+        return self._ends
+
+    @property
+    def durations(self):
+        """
+        returns the duration per connection
+        """
+
+        return self._durations
+
+    @property
+    def indptr(self):
+        """
+        returns the CSR row pointers per station
+        """
+
+        return self._indptr
+
+    @property
+    def neighbours(self):
+        """
+        returns the CSR neighbouring station ids
+        """
+
+        return self._neighbours
+
+    @property
+    def edges(self):
+        """
+        returns the CSR connection ids
+        """
+
+        return self._edges
+
+    @property
+    def fingerprint(self):
+        """
+        returns a hash identifying this graph, to check if data saved
+            for a graph (e.g. cached tables or solutions) still matches it
+        """
+
+        # hash the names and the connection arrays
+        sha1 = hashlib.sha1("\n".join(self._names).encode("utf-8"))
+        for array in (self._latitudes, self._longitudes, self._starts,
+                      self._ends, self._durations):
+            sha1.update(array.tobytes())
+
+        return sha1.hexdigest()
+
+    def station_id(self, name):
+        """
+        returns the station id of a station name
+
+        parameter:
+            name - name of the station;
+        """
+
+        # make sure the station is present
+        try:
+            return self._station_ids[name]
+        except KeyError:
+            exit(f"GraphError: station {name} not found")
+
+    def adjacent(self, sid):
+        """
+        returns the neighbouring station ids and connection ids of a station
+
+        parameter:
+            sid - station id;
+        """
+
+        begin, end = self._indptr[sid], self._indptr[sid + 1]
+
+        return self._neighbours[begin:end], self._edges[begin:end]
+
+    def other(self, cid, sid):
+        """
+        returns the other station id of a connection
+
+        parameters:
+            cid - connection id;
+            sid - station id of one end of the connection;
+        """
+
+        if self._starts[cid] == sid:
+            return int(self._ends[cid])
+
+        return int(self._starts[cid])
@@ -26,6 +26,9 @@ class Line():
         no_of_stations              - returns number of station in this line;
         stations                    - returns stations list of this line;
         connections                 - returns connections list of this line;
+        mask                        - returns bitset of used connection ids;
+        repeats                     - returns no. of connections used twice
+                                        in a row;
         penalty                     - returns the penalty value of this line;
         begin_end_station           - returns the begin and end stations;
         begin_end_station_index     - returns the begin end indices;
@@ -36,12 +39,18 @@ class Line():
         get_all_options         - get all options for this line;
         add_connection          - adds connection to line if valid;
             true if added correctly false if not;
+        remove_end              - removes the connection at one of the ends;
         split_line              - splits the line into 2 lines at given index;
+        copy                    - returns a shallow copy of this line;
+        encode                  - returns start station id and connection ids;
     """
 
     # define general unique identifier
     guid = 0
 
+    # recalculate the duration on each read to check the kept total
+    check_duration = False
+
     def __init__(self, init_station=None):
         """
         initialize the Line class
@@ -59,6 +68,9 @@ class Line():
         self._id = self.guid
         self._connections = []
         self._penalty = 0
+        self._duration = 0
+        self._mask = 0
+        self._repeats = 0
 
         # increase general unique identifier
         Line.guid += 1
@@ -72,21 +84,24 @@ class Line():
     @property
     def duration(self):
         """
-        returns the duration of this line
+        returns the duration of this line, kept up to date when
+            connections are added or removed
         """
 
-        # predefine the duration to 0
-        _duration = 0
+        # make sure the kept duration matches the connections if checked
+        if self.check_duration:
+            _duration = sum(connection.duration
+                            for connection in self._connections)
 
-        # loop over all the connections of this line and add to the duration
-        for connection in self._connections:
-            _duration += connection.duration
+            if abs(_duration - self._duration) > 1e-9:
+                raise ValueError(f"kept duration {self._duration} does not "
+                                 f"match the connections ({_duration})")
 
         # make sure the duration is 0 or more
-        if _duration < 0:
-            raise ValueError(f"{_duration} is smaller than 0")
+        if self._duration < 0:
+            raise ValueError(f"{self._duration} is smaller than 0")
         else:
-            return _duration
+            return self._duration
 
     @property
     def no_of_stations(self):
@@ -112,6 +127,31 @@ class Line():
 
         return self._connections
 
+    @property
+    def mask(self):
+        """
+        return the bitset of the used connections, bit cid is set if the
+            connection with that id is used
+        """
+
+        # rebuild the bitset if a connection has been removed
+        if self._mask is None:
+            self._mask = 0
+            for connection in self._connections:
+                self._mask |= 1 << connection.cid
+
+        return self._mask
+
+    @property
+    def repeats(self):
+        """
+        return the number of connections used twice in a row (the train
+            rides back and forth), kept up to date when connections are
+            added or removed
+        """
+
+        return self._repeats
+
     @property
     def penalty(self):
         """
@@ -233,6 +273,7 @@ class Line():
                     self._stations.append(station)
 
                 self._connections.append(connection)
+                self._duration += connection.duration
 
             # if not add it where it's posisble
             else:
@@ -242,20 +283,60 @@ class Line():
 
                 # if connection fits at the end add to the end
                 if connection.cid in current_end_options:
+                    if self._connections and \
+                            connection == self._connections[-1]:
+                        self._repeats += 1
                     next_station = current_end_options[connection.cid][1]
                     self._stations.append(next_station)
                     self._connections.append(connection)
+                    self._duration += connection.duration
 
                 # if connection fits at the begin add to the begin
                 elif connection.cid in current_start_options:
+                    if self._connections and \
+                            connection == self._connections[0]:
+                        self._repeats += 1
                     previous_station = current_start_options[connection.cid][1]
                     self._stations.insert(0, previous_station)
                     self._connections.insert(0, connection)
+                    self._duration += connection.duration
                 else:
                     return False
 
+        # add connection to the bitset
+        if self._mask is not None:
+            self._mask |= 1 << connection.cid
+
         return True
 
+    def remove_end(self, index):
+        """
+        removes the connection and station at one of the ends of the line
+
+        parameter:
+            index - end to remove from, 0 for the begin and -1 for the end;
+
+        returns the removed connection
+        """
+
+        # make sure the index is one of the ends
+        if index not in (0, -1):
+            exit("LineRemoveEndError: please make sure index is 0 or -1")
+
+        # remove the station and connection and subtract the duration
+        self._stations.pop(index)
+        connection = self._connections.pop(index)
+        self._duration -= connection.duration
+
+        # the removed connection might have been used twice in a row
+        if self._connections and self._connections[index] == connection:
+            self._repeats -= 1
+
+        # the connection might still be used, rebuild the bitset when needed
+        self._mask = None
+
+        return connection
+
     def split_line(self, index, max_duration):
         """
         splits line into 2 at given index
@@ -279,6 +360,36 @@ class Line():
 
         return line1, line2
 
+    def copy(self):
+        """
+        returns a shallow copy of this line, the stations and connections
+            are shared but the lists holding them are not
+        """
+
+        # create a new line with copies of the stations/connections lists
+        line = Line()
+        line._stations = self._stations.copy()
+        line._connections = self._connections.copy()
+        line._penalty = self._penalty
+        line._duration = self._duration
+        line._mask = self._mask
+        line._repeats = self._repeats
+
+        return line
+
+    def encode(self):
+        """
+        returns the start station id and the connection ids of this line,
+            a compact form to rebuild the line from (see load_data)
+        """
+
+        # an empty line has no start station
+        if not self._stations:
+            return None, ()
+
+        return self._stations[0].sid, \
+            tuple(connection.cid for connection in self._connections)
+
     def __repr__(self):
         """
         return representation of this class
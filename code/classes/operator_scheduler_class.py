@@ -0,0 +1,204 @@
+"""
+version: python 3.8
+operator_scheduler_class.py defines the Operator_Scheduler class used to
+    choose the operators of a local search by how well they pay off
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import random as rd
+
+
+class Operator_Scheduler():
+    """
+    the Operator_Scheduler class chooses operators like a multi-armed bandit
+        (probability matching), each operator keeps a recency weighted mean
+        of its improvement per second and is chosen with a probability in
+        proportion to it, every operator keeps a minimal probability so it
+        can still be found when it starts to pay off
+
+    parameters:
+        operators       - operators to choose from;
+        rng             - random number generator (default random module);
+        min_probability - minimal probability of each operator (default
+                            0.05);
+        decay           - weight of the newest reward (default 0.1);
+        timed           - reward the improvement per second, else per use,
+                            which keeps seeded runs reproducible (default
+                            True);
+
+    properties:
+        operators       - returns the operators to choose from;
+        min_probability - returns the minimal probability of each operator;
+            setter sets it, 1/no. of operators chooses uniformly;
+        probabilities   - returns the probability of each operator;
+        rewards         - returns the mean reward of each operator;
+            setter sets the rewards, e.g. of a chain or checkpoint;
+
+    methods:
+        choose  - returns an operator to use;
+        update  - updates the reward of an operator after it's used;
+        reset   - forgets the rewards of all operators;
+    """
+
+    def __init__(self, operators, rng=rd, min_probability=0.05, decay=0.1,
+                 timed=True):
+        """
+        initialize the Operator_Scheduler
+
+        parameters:
+            operators       - operators to choose from;
+            rng             - random number generator (default random
+                module);
+            min_probability - minimal probability of each operator (default
+                0.05);
+            decay           - weight of the newest reward (default 0.1);
+            timed           - reward the improvement per second, else per
+                use (default True);
+        """
+
+        # make sure the probabilities can add up to 1
+        try:
+            assert operators
+            assert 0 <= min_probability <= 1 / len(operators)
+            assert 0 < decay <= 1
+        except (AssertionError, TypeError):
+            exit("Operator_SchedulerInitError: please make sure there are "
+                 "operators, min_probability is at most 1/no. of operators "
+                 "and decay is between 0 and 1")
+
+        self._operators = list(operators)
+        self._rng = rng
+        self._min_probability = min_probability
+        self._decay = decay
+        self._timed = timed
+
+        # mean improvement per second of each operator
+        self._rewards = [0.] * len(self._operators)
+        self._index = {operator: index
+                       for index, operator in enumerate(self._operators)}
+
+        # probabilities, predefined as None until asked for
+        self._probabilities = None
+
+    @property
+    def operators(self):
+        """
+        returns the operators to choose from
+        """
+
+        return self._operators
+
+    @property
+    def min_probability(self):
+        """
+        returns the minimal probability of each operator
+        """
+
+        return self._min_probability
+
+    @min_probability.setter
+    def min_probability(self, min_probability):
+        """
+        sets the minimal probability of each operator
+        """
+
+        # make sure the probabilities can add up to 1
+        if not 0 <= min_probability <= 1 / len(self._operators):
+            exit("Operator_SchedulerError: please make sure min_probability "
+                 "is at most 1/no. of operators")
+
+        self._min_probability = min_probability
+        self._probabilities = None
+
+    @property
+    def probabilities(self):
+        """
+        returns the probability of each operator
+        """
+
+        # recalculate only when the rewards changed
+        if self._probabilities is None:
+            total = sum(self._rewards)
+
+            # choose uniformly until an operator pays off
+            if total <= 0:
+                self._probabilities = [1 / len(self._operators)] * \
+                    len(self._operators)
+            else:
+                share = 1 - self._min_probability * len(self._operators)
+                self._probabilities = [self._min_probability +
+                                       share * reward / total
+                                       for reward in self._rewards]
+
+        return self._probabilities
+
+    @property
+    def rewards(self):
+        """
+        returns the mean reward of each operator
+        """
+
+        return list(self._rewards)
+
+    @rewards.setter
+    def rewards(self, rewards):
+        """
+        sets the mean reward of each operator
+        """
+
+        # make sure there is a reward for each operator
+        if len(rewards) != len(self._operators):
+            exit("Operator_SchedulerError: please make sure there is a "
+                 "reward for each operator")
+
+        self._rewards = [float(reward) for reward in rewards]
+        self._probabilities = None
+
+    def choose(self, operators=None):
+        """
+        returns an operator to use
+
+        parameter:
+            operators   - operators to choose from, e.g. the ones that can be
+                            used now (default all);
+        """
+
+        # choose from all operators
+        if operators is None:
+            return self._rng.choices(self._operators, self.probabilities)[0]
+
+        # choose from the given operators with their own probabilities
+        probabilities = self.probabilities
+        return self._rng.choices(operators, [probabilities[self._index[
+            operator]] for operator in operators])[0]
+
+    def update(self, operator, delta, seconds):
+        """
+        updates the reward of an operator after it's used, the reward is the
+            improvement of the score per second (or per use if not timed)
+
+        parameters:
+            operator    - operator that is used;
+            delta       - change of the score by the operator;
+            seconds     - time spent on the operator;
+        """
+
+        index = self._index[operator]
+        reward = max(delta, 0)
+        if self._timed:
+            reward /= max(seconds, 1e-9)
+
+        self._rewards[index] += self._decay * (reward - self._rewards[index])
+        self._probabilities = None
+
+    def reset(self):
+        """
+        forgets the rewards of all operators
+        """
+
+        self._rewards = [0.] * len(self._operators)
+        self._probabilities = None
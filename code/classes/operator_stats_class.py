@@ -0,0 +1,120 @@
+"""
+version: python 3.8
+operator_stats_class.py defines the Operator_Stats class used to keep how
+    often and how well the operators of a local search pay off
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import csv
+
+
+class Operator_Stats():
+    """
+    the Operator_Stats class keeps per operator the number of calls and
+        accepted moves, the time spent and the change of the score
+
+    properties:
+        fields  - returns the fields of the rows;
+
+    methods:
+        record  - records one move of an operator;
+        merge   - merges other operator stats into these;
+        rows    - returns a row with the totals and rates per operator;
+        write   - writes the rows to a csv file;
+    """
+
+    def __init__(self):
+        """
+        initialize the Operator_Stats
+        """
+
+        # calls, accepted moves, seconds and score change per operator
+        self._stats = dict()
+
+    @property
+    def fields(self):
+        """
+        returns the fields of the rows
+        """
+
+        return ["operator", "calls", "accepted", "acceptance", "seconds",
+                "us_per_call", "delta", "delta_per_s"]
+
+    def record(self, operator, accepted, seconds, delta):
+        """
+        records one move of an operator
+
+        parameters:
+            operator    - name of the operator;
+            accepted    - if the move is accepted;
+            seconds     - time spent on the move;
+            delta       - change of the score by the move;
+        """
+
+        stats = self._stats.get(operator)
+        if stats is None:
+            stats = self._stats[operator] = [0, 0, 0., 0.]
+
+        # the score only changes if the move is accepted
+        stats[0] += 1
+        stats[2] += seconds
+        if accepted:
+            stats[1] += 1
+            stats[3] += delta
+
+    def merge(self, other):
+        """
+        merges other operator stats into these
+
+        parameter:
+            other - operator stats to merge;
+        """
+
+        for operator, other_stats in other._stats.items():
+            stats = self._stats.setdefault(operator, [0, 0, 0., 0.])
+            for index, value in enumerate(other_stats):
+                stats[index] += value
+
+    def rows(self):
+        """
+        returns a row with the totals and rates per operator
+        """
+
+        rows = []
+        for operator, (calls, accepted, seconds, delta) in \
+                self._stats.items():
+            rows.append({"operator": operator, "calls": calls,
+                         "accepted": accepted,
+                         "acceptance": accepted / calls,
+                         "seconds": seconds,
+                         "us_per_call": seconds / calls * 1e6,
+                         "delta": delta,
+                         "delta_per_s": delta / seconds if seconds else 0.})
+
+        return rows
+
+    def write(self, output_file):
+        """
+        writes the rows to a csv file
+
+        parameter:
+            output_file - csv file to write to;
+        """
+
+        with open(output_file, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=self.fields)
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    def __contains__(self, operator):
+        return operator in self._stats
+
+    def __iter__(self):
+        return iter(self._stats)
+
+    def __len__(self):
+        return len(self._stats)
@@ -0,0 +1,162 @@
+"""
+version: python 3.8
+score_class.py defines the Score class used to keep track of the goal function
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+
+class Score():
+    """
+    the Score class keeps the state needed for the goal function
+        (connection usage, total minutes and number of lines) so it can be
+        updated by delta when a single line changes
+
+    parameters:
+        n_of_connections    - total number of connections in the database;
+        lines               - lines to start the score with (default None);
+        penalty             - penalty added to the minutes (default 0);
+
+    properties:
+        usage       - returns the usage count per connection id;
+        minutes     - returns the total minutes of all lines;
+        n_of_l      - returns the number of lines;
+        covered     - returns the number of used connections;
+        p           - returns the coverage;
+        K           - returns the value of the goal function;
+
+    methods:
+        add_line        - adds a line to the score;
+        remove_line     - removes a line from the score;
+        replace_line    - replaces a line in the score by another line;
+    """
+
+    def __init__(self, n_of_connections, lines=None, penalty=0):
+        """
+        initialize the Score
+
+        parameters:
+            n_of_connections    - total number of connections in the database;
+            lines               - lines to start the score with
+                (default None);
+            penalty             - penalty added to the minutes (default 0);
+        """
+
+        # make sure the number of connections is a positive integer
+        try:
+            assert int(n_of_connections) > 0
+        except (AssertionError, ValueError):
+            exit("ScoreInitError: please make sure the number of connections "
+                 "is a positive integer")
+
+        self._n_of_connections = int(n_of_connections)
+        self._usage = dict()
+        self._minutes = penalty
+        self._n_of_l = 0
+
+        # add the starting lines
+        if lines:
+            for line in lines:
+                self.add_line(line)
+
+    @property
+    def usage(self):
+        """
+        returns the usage count per connection id
+        """
+
+        return self._usage
+
+    @property
+    def minutes(self):
+        """
+        returns the total minutes of all lines
+        """
+
+        return self._minutes
+
+    @property
+    def n_of_l(self):
+        """
+        returns the number of lines
+        """
+
+        return self._n_of_l
+
+    @property
+    def covered(self):
+        """
+        returns the number of used connections
+        """
+
+        return len(self._usage)
+
+    @property
+    def p(self):
+        """
+        returns the coverage
+        """
+
+        return len(self._usage) / self._n_of_connections
+
+    @property
+    def K(self):
+        """
+        returns the value of the goal function
+        """
+
+        return self.p * 10000 - (self._n_of_l * 100 + self._minutes)
+
+    def add_line(self, line):
+        """
+        adds a line to the score
+
+        parameter:
+            line - line to be added;
+        """
+
+        # count the usage of each connection and add the minutes
+        for connection in line.connections:
+            self._usage[connection.cid] = \
+                self._usage.get(connection.cid, 0) + 1
+
+        self._minutes += line.duration
+        self._n_of_l += 1
+
+    def remove_line(self, line):
+        """
+        removes a line from the score
+
+        parameter:
+            line - line to be removed;
+        """
+
+        # uncount the usage of each connection, forget unused connections
+        for connection in line.connections:
+            count = self._usage[connection.cid] - 1
+
+            if count:
+                self._usage[connection.cid] = count
+            else:
+                del self._usage[connection.cid]
+
+        self._minutes -= line.duration
+        self._n_of_l -= 1
+
+    def replace_line(self, old_line, new_line):
+        """
+        replaces a line in the score by another line
+
+        parameters:
+            old_line - line to be removed;
+            new_line - line to be added in its place;
+
+        returns the new value of the goal function and the coverage
+        """
+
+        self.remove_line(old_line)
+        self.add_line(new_line)
+
+        return self.K, self.p
@@ -0,0 +1,266 @@
+"""
+version: python 3.8
+score_history_class.py defines the Score_History class used to keep the
+    scores of the runs of an algorithm
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import csv
+
+from array import array
+
+
+class Score_History():
+    """
+    the Score_History class keeps score traces per key (e.g. run or number
+        of lines) as compact arrays of doubles, in memory only every n-th
+        record is kept and all records can be streamed to a csv file
+
+    parameters:
+        every       - keep one of every n records per key (default 1);
+        stream_file - csv file to stream all records to, one key, field,
+                        value row per value (default None);
+
+    properties:
+        every       - returns the number of records per kept record;
+        stream_file - returns the csv file the records are streamed to;
+
+    methods:
+        record  - records values for a key;
+        merge   - merges another score history into this one;
+        flush   - flushes the records streamed to the csv file;
+        reopen  - streams on to the csv file of a pickled history;
+        close   - closes the csv file;
+        keys    - returns the keys of the history;
+        items   - returns the keys and traces of the history;
+        values  - returns the traces of the history;
+    """
+
+    def __init__(self, every=1, stream_file=None):
+        """
+        initialize the Score_History
+
+        parameters:
+            every       - keep one of every n records per key (default 1);
+            stream_file - csv file to stream all records to (default None);
+        """
+
+        # make sure every is a positive integer
+        try:
+            every = int(every)
+            assert every > 0
+        except (AssertionError, ValueError):
+            exit("Score_HistoryInitError: please make sure every is a "
+                 "positive integer")
+
+        self._every = every
+        self._stream_file = stream_file
+        self._traces = dict()
+        self._counts = dict()
+
+        # open the stream file and write the header
+        if stream_file:
+            self._file = open(stream_file, "w", newline="")
+            self._writer = csv.writer(self._file, delimiter=",")
+            self._writer.writerow(["key", "field", "value"])
+        else:
+            self._file = None
+
+    @property
+    def every(self):
+        """
+        returns the number of records per kept record
+        """
+
+        return self._every
+
+    @property
+    def stream_file(self):
+        """
+        returns the csv file the records are streamed to
+        """
+
+        return self._stream_file
+
+    def record(self, key, **values):
+        """
+        records values for a key, e.g. record(run, iterations=i, scores=K)
+
+        parameters:
+            key     - key to record the values for;
+            values  - value per field;
+        """
+
+        # stream every record to the file
+        if self._file:
+            self._writer.writerows([key, field, value]
+                                   for field, value in values.items())
+
+        self._keep(key, values)
+
+    def _keep(self, key, values):
+        """
+        keeps only every n-th record per key in memory
+
+        parameters:
+            key     - key to keep the values for;
+            values  - value per field;
+        """
+
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self._every:
+            return
+
+        # add the values to the traces of this key
+        trace = self._traces.setdefault(key, dict())
+        for field, value in values.items():
+            trace.setdefault(field, array("d")).append(value)
+
+    def merge(self, other, offset=0):
+        """
+        merges another score history into this one, the run numbers are
+            offset (run keys of iterative algorithms and runs values), the
+            merged records are streamed to the csv file as well and only
+            every n-th is kept in memory
+
+        parameters:
+            other   - score history to merge;
+            offset  - offset of the run numbers (default 0);
+        """
+
+        for key, trace in other.items():
+
+            # scores per run (iterative algorithms) get a new run key
+            if "iterations" in trace:
+                key += offset
+
+            # offset the run numbers
+            trace = {field: array("d", (run + offset for run in values))
+                     if field == "runs" else values
+                     for field, values in trace.items()}
+
+            # keep every n-th record in memory, counting on from the
+            #   records of this key so far
+            count = self._counts.get(key, 0)
+            first = -count % self._every
+            own_trace = self._traces.setdefault(key, dict())
+            for field, values in trace.items():
+                own_trace.setdefault(field, array("d")).extend(
+                    values[first::self._every])
+            self._counts[key] = count + len(next(iter(trace.values()), ()))
+
+            # stream the merged records to the file
+            if self._file:
+                for row in zip(*trace.values()):
+                    self._writer.writerows([key, field, value] for field,
+                                           value in zip(trace, row))
+
+    def flush(self):
+        """
+        flushes the records streamed to the csv file
+        """
+
+        if self._file:
+            self._file.flush()
+
+    def reopen(self):
+        """
+        reopens the csv file of a pickled history (e.g. of a checkpoint) to
+            stream on to, the records streamed after it was pickled are
+            removed so every record is in the file once and the traces in
+            memory are read back from it
+        """
+
+        if not self._stream_file:
+            return
+
+        # make sure the csv file still holds the records of the history
+        try:
+            self._file = open(self._stream_file, "r+", newline="")
+            self._file.seek(self._position)
+            self._file.truncate()
+        except (OSError, TypeError):
+            exit("Score_HistoryError: please make sure the csv file "
+                 f"{self._stream_file} of the scores still exists")
+
+        # read the records back, the rows of a record are written in a row
+        #   for the same key and a field repeats in the next record
+        self._file.seek(0)
+        rows = csv.reader(self._file, delimiter=",")
+        next(rows, None)
+        key, values = None, dict()
+        for row_key, field, value in rows:
+            row_key = int(row_key) if row_key.lstrip("-").isdigit() \
+                else row_key
+            if row_key != key or field in values:
+                if values:
+                    self._keep(key, values)
+                key, values = row_key, dict()
+            values[field] = float(value)
+        if values:
+            self._keep(key, values)
+
+        self._writer = csv.writer(self._file, delimiter=",")
+
+    def close(self):
+        """
+        closes the csv file
+        """
+
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def keys(self):
+        """
+        returns the keys of the history
+        """
+
+        return self._traces.keys()
+
+    def items(self):
+        """
+        returns the keys and traces of the history
+        """
+
+        return self._traces.items()
+
+    def values(self):
+        """
+        returns the traces of the history
+        """
+
+        return self._traces.values()
+
+    def __getitem__(self, key):
+        return self._traces[key]
+
+    def __contains__(self, key):
+        return key in self._traces
+
+    def __iter__(self):
+        return iter(self._traces)
+
+    def __len__(self):
+        return len(self._traces)
+
+    def __getstate__(self):
+        # the stream file stays with the process that opened it, the
+        #   position in it is kept so it can be reopened
+        state = self.__dict__.copy()
+        state["_position"] = self._file.tell() if self._file else None
+        state["_file"] = None
+        state.pop("_writer", None)
+
+        # the records of a streamed history are in its csv file, they're
+        #   read back when it's reopened so they're left out of the state
+        if self._file:
+            state["_traces"] = dict()
+            state["_counts"] = dict()
+
+        return state
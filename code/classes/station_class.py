@@ -19,16 +19,19 @@ class Station():
         name    - name of the station;
         lat     - longitude position of the station;
         long    - latitiude position of the station;
+        graph   - graph this station is a view on (default None);
 
     properties:
         position        - returns the longitude and latitude of the station;
         connections     - returns all all connections of this station;
+        graph           - returns the graph this station is a view on;
+        sid             - returns the station id in the graph;
 
     method:
         add_connection - add connection to this stop;
     """
 
-    def __init__(self, name, lat, long):
+    def __init__(self, name, lat, long, graph=None):
         """
         initialize a station
 
@@ -36,6 +39,7 @@ class Station():
             name    - name of the station;
             lat     - latitude position of the station;
             long    - longitude position of the station;
+            graph   - graph this station is a view on (default None);
         """
 
         # make sure lat/long are floats and name is a string
@@ -47,12 +51,22 @@ class Station():
             exit("StationInitError: please make sure the name is a string "
                  "and long/lat are floats")
 
-        # define name, longitude, latitude and connections attirbutes
+        # define name, graph and connections attributes
         self._name = name
-        self._longitude = long
-        self._latitude = lat
+        self._graph = graph
         self._connections = dict()
 
+        # the position is kept in the graph if there is one, and as floats
+        #   as well so reading it stays cheap
+        if graph is not None:
+            self._sid = graph.station_id(name)
+            self._longitude = float(graph.longitudes[self._sid])
+            self._latitude = float(graph.latitudes[self._sid])
+        else:
+            self._sid = None
+            self._longitude = long
+            self._latitude = lat
+
     @property
     def position(self):
         """
@@ -61,6 +75,22 @@ class Station():
 
         return self._longitude, self._latitude
 
+    @property
+    def graph(self):
+        """
+        return the graph this station is a view on
+        """
+
+        return self._graph
+
+    @property
+    def sid(self):
+        """
+        return the station id in the graph
+        """
+
+        return self._sid
+
     @property
     def connections(self):
         """
@@ -102,7 +132,7 @@ class Station():
         """
 
         return f"{self._name} at position " \
-            f"(long: {self._longitude}, lat: {self._latitude})"
+            f"(long: {self.position[0]}, lat: {self.position[1]})"
 
     def __str__(self):
         """
@@ -112,4 +142,11 @@ class Station():
         return self._name
 
     def __eq__(self, other):
+        # compare station ids if both stations are views on the same graph
+        if self._graph is not None and self._graph is other._graph:
+            return self._sid == other._sid
+
         return self._name == other._name
+
+    def __hash__(self):
+        return hash(self._name)
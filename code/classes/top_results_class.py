@@ -0,0 +1,140 @@
+"""
+version: python 3.8
+top_results_class.py defines the Top_Results class used to keep the best
+    results of an algorithm
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import heapq
+
+
+class Top_Results():
+    """
+    the Top_Results class keeps the k best (lines, K, p) results in a heap,
+        identical solutions are only kept once
+
+    parameters:
+        k - number of results to keep (default 5);
+
+    properties:
+        k       - returns the number of results to keep;
+        results - returns the kept results, best first;
+
+    methods:
+        solution_key    - returns the key to find identical solutions;
+        add             - adds a result if it is good enough;
+        extend          - adds multiple results;
+    """
+
+    def __init__(self, k=5):
+        """
+        initialize the Top_Results
+
+        parameter:
+            k - number of results to keep (default 5);
+        """
+
+        # make sure k is a positive integer
+        try:
+            k = int(k)
+            assert k > 0
+        except (AssertionError, ValueError):
+            exit("Top_ResultsInitError: please make sure k is a positive "
+                 "integer")
+
+        self._k = k
+
+        # heap of (K, counter, key, result), the worst result is at the top
+        self._heap = []
+        self._keys = set()
+        self._counter = 0
+
+        # sorted results, predefined as None until asked for
+        self._results = None
+
+    @property
+    def k(self):
+        """
+        returns the number of results to keep
+        """
+
+        return self._k
+
+    @property
+    def results(self):
+        """
+        returns the kept results, best first (equal scores oldest first)
+        """
+
+        # sort the heap only when it changed
+        if self._results is None:
+            self._results = [item[3] for item in
+                             sorted(self._heap, key=lambda x: (-x[0], x[1]))]
+
+        return self._results
+
+    def solution_key(self, lines):
+        """
+        returns the key to find identical solutions
+
+        parameter:
+            lines - lines of the solution;
+        """
+
+        return tuple(line.encode() for line in lines)
+
+    def add(self, result):
+        """
+        adds a result if it is good enough and not kept already
+
+        parameter:
+            result - (lines, K, p) tuple;
+
+        returns True if the result is kept and False if not
+        """
+
+        # a full heap only takes results better than the worst kept one
+        if len(self._heap) >= self._k and result[1] <= self._heap[0][0]:
+            return False
+
+        # skip identical solutions
+        key = self.solution_key(result[0])
+        if key in self._keys:
+            return False
+
+        # add the result, replacing the worst one if the heap is full
+        item = (result[1], self._counter, key, result)
+        if len(self._heap) >= self._k:
+            self._keys.remove(heapq.heapreplace(self._heap, item)[2])
+        else:
+            heapq.heappush(self._heap, item)
+
+        self._keys.add(key)
+        self._counter += 1
+        self._results = None
+
+        return True
+
+    def extend(self, results):
+        """
+        adds multiple results
+
+        parameter:
+            results - iterable of (lines, K, p) tuples;
+        """
+
+        for result in results:
+            self.add(result)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def __iter__(self):
+        return iter(self.results)
@@ -0,0 +1,160 @@
+"""
+version: python 3.8
+distances.py defines the distances between the stations in a graph, the
+    distances to a station are computed once per graph and shared by
+    everyone asking for them
+
+methods:
+    haversine           - returns great circle distances between pairs;
+    geodesic            - returns geodesic distances between pairs;
+    pair_distances      - returns the distances between pairs of stations;
+    station_distances   - returns the (cached) distances to a station;
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import os
+import weakref
+import numpy as np
+
+from geopy import distance
+
+# mean radius of the earth in km
+EARTH_RADIUS = 6371.0088
+
+# distances to a station per graph, method and station id, dropped with the
+#   graph
+rows = weakref.WeakKeyDictionary()
+
+
+def haversine(latitudes1, longitudes1, latitudes2, longitudes2):
+    """
+    returns the great circle distances between pairs of positions, the
+        arrays are broadcast against each other
+
+    parameters:
+        latitudes1  - latitudes of the first positions;
+        longitudes1 - longitudes of the first positions;
+        latitudes2  - latitudes of the second positions;
+        longitudes2 - longitudes of the second positions;
+
+    returns distances in km
+    """
+
+    # convert positions to radians
+    lat1, long1, lat2, long2 = (np.radians(np.asarray(x, dtype=np.float64))
+                                for x in (latitudes1, longitudes1,
+                                          latitudes2, longitudes2))
+
+    # haversine formula for all pairs at once
+    a = np.sin((lat2 - lat1) / 2) ** 2 + \
+        np.cos(lat1) * np.cos(lat2) * np.sin((long2 - long1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def geodesic(latitudes1, longitudes1, latitudes2, longitudes2):
+    """
+    returns the geodesic (ellipsoidal) distances between pairs of positions
+        using geopy, slower but more precise than haversine, the arrays are
+        broadcast against each other
+
+    parameters:
+        latitudes1  - latitudes of the first positions;
+        longitudes1 - longitudes of the first positions;
+        latitudes2  - latitudes of the second positions;
+        longitudes2 - longitudes of the second positions;
+
+    returns distances in km
+    """
+
+    # pair up the positions
+    lat1, long1, lat2, long2 = np.broadcast_arrays(latitudes1, longitudes1,
+                                                   latitudes2, longitudes2)
+
+    # calculate each pair with geopy
+    matrix = np.zeros(lat1.shape)
+    for index in np.ndindex(matrix.shape):
+        matrix[index] = distance.distance((lat1[index], long1[index]),
+                                          (lat2[index], long2[index])).km
+
+    return matrix
+
+
+# define the methods
+methods = {"haversine": haversine, "geodesic": geodesic}
+
+
+def pair_distances(graph, sids1, sids2, method="haversine"):
+    """
+    returns the distances between pairs of stations of a graph
+
+    parameters:
+        graph   - graph of the stations;
+        sids1   - station ids of the first stations;
+        sids2   - station ids of the second stations;
+        method  - haversine or geodesic (default haversine);
+
+    returns distances in km
+    """
+
+    # make sure method exists
+    if method not in methods:
+        exit(f"DistanceError: method should be one of {', '.join(methods)}")
+
+    return methods[method](graph.latitudes[sids1], graph.longitudes[sids1],
+                           graph.latitudes[sids2], graph.longitudes[sids2])
+
+
+def station_distances(graph, sid, method="haversine", cache_file=None):
+    """
+    returns the distances from all stations of a graph to one station,
+        computed once per graph, method and station, so an N x N matrix is
+        never needed, and optionally kept in a cache file
+
+    parameters:
+        graph       - graph to get the distances for;
+        sid         - station id to get the distances to;
+        method      - haversine or geodesic (default haversine);
+        cache_file  - .npz file to load/save the distances, worth it for
+                        the slow geodesic method (default None);
+
+    returns distances in km indexed by station id
+    """
+
+    # return the distances if already computed for this graph
+    graph_rows = rows.setdefault(graph, dict())
+    method_rows = graph_rows.get(method)
+    if method_rows is None:
+        method_rows = graph_rows[method] = dict()
+
+        # load the distances from the cache file if it matches this graph
+        if cache_file and os.path.isfile(cache_file):
+            cache = np.load(cache_file)
+            if str(cache["fingerprint"]) == graph.fingerprint and \
+                    str(cache["method"]) == method:
+                method_rows.update(zip(cache["sids"].tolist(),
+                                       cache["distances"]))
+
+    if sid in method_rows:
+        return method_rows[sid]
+
+    # compute the distances to the station
+    all_sids = np.arange(graph.n_of_stations)
+    method_rows[sid] = pair_distances(graph, all_sids, sid, method)
+
+    # save all distances computed so far, a temporary file first so
+    #   processes saving at the same time can't mix their files
+    if cache_file:
+        sids = sorted(method_rows)
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            np.savez(file, fingerprint=graph.fingerprint, method=method,
+                     sids=np.array(sids),
+                     distances=np.array([method_rows[key] for key in sids]))
+        os.replace(temporary_file, cache_file)
+
+    return method_rows[sid]
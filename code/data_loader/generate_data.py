@@ -0,0 +1,276 @@
+"""
+version: python 3.8
+generate_data.py generates synthetic railway networks to test how the
+    algorithms scale, the stations are spread over the Netherlands and
+    connected by an (approximate) Gabriel or relative neighbourhood graph,
+    which is planar and looks like a real railway network
+
+methods:
+    project             - returns the positions in km on a flat map;
+    nearest_neighbours  - returns the k nearest neighbours of all positions;
+    empty_region_edges  - returns the candidate edges without a blocking
+                            station in between;
+    find                - returns the root of a station in a union-find;
+    connect             - returns extra edges so the network is connected;
+    generate            - returns a synthetic network as a Graph;
+    save                - saves a graph as stations and connections files;
+
+authors:
+    Dani van Enk, 11823526
+    Michael Faber, 6087582
+"""
+
+# used imports
+import csv
+import numpy as np
+
+from code.classes import Graph
+from code.data_loader.distances import EARTH_RADIUS, haversine
+
+# latitude and longitude bounds of the Netherlands
+BOUNDS = ((50.75, 53.5), (3.4, 7.2))
+
+# fastest minutes per km in the national network (about 100 km/h)
+MINUTES_PER_KM = 0.6
+
+
+def project(latitudes, longitudes):
+    """
+    returns the positions in km on a flat (equirectangular) map, which is
+        precise enough to find neighbours in an area as small as a country
+
+    parameters:
+        latitudes   - latitudes of the positions;
+        longitudes  - longitudes of the positions;
+
+    returns array of (x, y) positions in km
+    """
+
+    # km per degree and the shrinking of longitude degrees
+    scale = np.radians(1) * EARTH_RADIUS
+    shrink = np.cos(np.radians(np.mean(latitudes)))
+
+    return np.column_stack((longitudes * scale * shrink, latitudes * scale))
+
+
+def nearest_neighbours(points, k, chunk_size=256):
+    """
+    returns the k nearest neighbours of all positions, computed in chunks
+        so memory stays O(chunk_size * n)
+
+    parameters:
+        points      - (x, y) positions;
+        k           - number of neighbours;
+        chunk_size  - number of positions per chunk (default 256);
+
+    returns array of neighbour indices per position
+    """
+
+    # predefine the neighbours
+    n = len(points)
+    neighbours = np.empty((n, k), dtype=np.int64)
+    squares = np.sum(points ** 2, axis=1)
+
+    for start in range(0, n, chunk_size):
+        block = points[start:start + chunk_size]
+        rows = np.arange(len(block))
+
+        # squared distances of the chunk to all positions, not to itself
+        distances = squares[start:start + chunk_size, np.newaxis] + \
+            squares[np.newaxis, :] - 2 * block @ points.T
+        distances[rows, rows + start] = np.inf
+
+        neighbours[start:start + len(block)] = \
+            np.argpartition(distances, k - 1, axis=1)[:, :k]
+
+    return neighbours
+
+
+def empty_region_edges(points, neighbours, method="gabriel"):
+    """
+    returns the candidate edges (to the nearest neighbours) without a
+        blocking station in between, only the neighbours of both ends are
+        checked, so the graph is an approximation
+
+        gabriel     - no station in the circle with the edge as diameter;
+        relative    - no station closer to both ends than they are to each
+                        other (sparser, closer to a real railway network);
+
+    parameters:
+        points      - (x, y) positions;
+        neighbours  - nearest neighbours per position;
+        method      - gabriel or relative (default gabriel);
+
+    returns array of kept edges and array of rejected candidate edges
+    """
+
+    # make sure method exists
+    if method not in ("gabriel", "relative"):
+        exit("GenerateError: method should be one of gabriel, relative")
+
+    # unique candidate edges with the lowest station first
+    n, k = neighbours.shape
+    edges = np.column_stack((np.repeat(np.arange(n), k), neighbours.ravel()))
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+
+    # squared lengths of the edges and to the stations that could block them
+    witnesses = np.hstack((neighbours[edges[:, 0]], neighbours[edges[:, 1]]))
+    length = np.sum((points[edges[:, 0]] - points[edges[:, 1]]) ** 2, axis=1)
+    to_start = np.sum((points[witnesses] -
+                       points[edges[:, 0], np.newaxis]) ** 2, axis=2)
+    to_end = np.sum((points[witnesses] -
+                     points[edges[:, 1], np.newaxis]) ** 2, axis=2)
+
+    # the ends of an edge never block it themselves
+    tolerance = 1e-9 * length[:, np.newaxis]
+    if method == "gabriel":
+        blocked = to_start + to_end < length[:, np.newaxis] - tolerance
+    else:
+        blocked = np.maximum(to_start, to_end) < \
+            length[:, np.newaxis] - tolerance
+    blocked = np.any(blocked, axis=1)
+
+    return edges[~blocked], edges[blocked]
+
+
+def find(parents, station):
+    """
+    returns the root of a station in a union-find, halving the path
+
+    parameters:
+        parents - parent per station;
+        station - station to find the root for;
+    """
+
+    while parents[station] != station:
+        parents[station] = parents[parents[station]]
+        station = parents[station]
+
+    return station
+
+
+def connect(points, edges, candidates):
+    """
+    returns extra edges so the network is connected, first the shortest
+        rejected candidates (Kruskal), then the closest pair of stations
+        between the remaining components
+
+    parameters:
+        points      - (x, y) positions;
+        edges       - edges of the network;
+        candidates  - rejected candidate edges;
+
+    returns list of extra edges
+    """
+
+    # join the stations of all edges
+    parents = list(range(len(points)))
+    for start, end in edges:
+        parents[find(parents, start)] = find(parents, end)
+
+    # add the shortest candidates that join two components
+    extra = []
+    lengths = np.sum((points[candidates[:, 0]] -
+                      points[candidates[:, 1]]) ** 2, axis=1)
+    for start, end in candidates[np.argsort(lengths)]:
+        root_start, root_end = find(parents, start), find(parents, end)
+        if root_start != root_end:
+            parents[root_start] = root_end
+            extra.append((start, end))
+
+    # join the remaining components to their closest other station
+    roots = np.array([find(parents, station)
+                      for station in range(len(points))])
+    while len(set(roots)) > 1:
+        members = np.flatnonzero(roots == roots[0])
+        others = np.flatnonzero(roots != roots[0])
+        distances = np.sum((points[members, np.newaxis] -
+                            points[np.newaxis, others]) ** 2, axis=2)
+        start, end = np.unravel_index(np.argmin(distances), distances.shape)
+        extra.append((members[start], others[end]))
+        roots[members] = roots[others[end]]
+
+    return extra
+
+
+def generate(n_of_stations, seed=None, k=8, method="gabriel",
+             minutes_per_km=MINUTES_PER_KM, detour=1.0, bounds=BOUNDS):
+    """
+    returns a synthetic network, the duration of each connection is the
+        distance at the fastest speed times a random detour factor, so the
+        durations are consistent with the positions
+
+    parameters:
+        n_of_stations   - number of stations;
+        seed            - seed of the network (default None);
+        k               - number of neighbours to connect to (default 8);
+        method          - gabriel or relative (default gabriel);
+        minutes_per_km  - fastest minutes per km (default 0.6);
+        detour          - maximal extra duration factor (default 1.0);
+        bounds          - latitude and longitude bounds (default the
+                            Netherlands);
+
+    returns Graph of the network
+    """
+
+    # make sure the network can be connected
+    try:
+        n_of_stations = int(n_of_stations)
+        assert n_of_stations > 1
+    except (AssertionError, ValueError):
+        exit("GenerateError: please make sure n_of_stations is an integer "
+             "bigger than 1")
+
+    rng = np.random.default_rng(seed)
+
+    # spread the stations over the area
+    latitudes = rng.uniform(*bounds[0], n_of_stations)
+    longitudes = rng.uniform(*bounds[1], n_of_stations)
+    points = project(latitudes, longitudes)
+
+    # connect the stations to their neighbours and make sure it's connected
+    neighbours = nearest_neighbours(points, min(k, n_of_stations - 1))
+    edges, candidates = empty_region_edges(points, neighbours, method)
+    extra = connect(points, edges, candidates)
+    if extra:
+        edges = np.vstack((edges, extra))
+
+    # durations in whole minutes from the distances
+    distances = haversine(latitudes[edges[:, 0]], longitudes[edges[:, 0]],
+                          latitudes[edges[:, 1]], longitudes[edges[:, 1]])
+    durations = np.maximum(np.round(distances * minutes_per_km *
+                                    rng.uniform(1, 1 + detour, len(edges))),
+                           1)
+
+    # name the stations by number
+    width = len(str(n_of_stations - 1))
+    names = [f"Station {sid:0{width}d}" for sid in range(n_of_stations)]
+
+    return Graph(names, latitudes, longitudes, edges[:, 0], edges[:, 1],
+                 durations)
+
+
+def save(graph, stations_file, connections_file):
+    """
+    saves a graph as stations and connections files that can be loaded with
+        load_data.load
+
+    parameters:
+        graph               - graph to save;
+        stations_file       - path to the stations file;
+        connections_file    - path to the connections file;
+    """
+
+    # write the stations
+    with open(stations_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=",")
+        writer.writerow(["station", "x", "y"])
+        writer.writerows(zip(graph.names, graph.latitudes, graph.longitudes))
+
+    # write the connections
+    with open(connections_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=",")
+        writer.writerow(["station1", "station2", "distance"])
+        writer.writerows((graph.names[start], graph.names[end], duration)
+                         for start, end, duration
+                         in zip(graph.starts, graph.ends, graph.durations))
@@ -1,7 +1,10 @@
 """
 version: python 3.8
 load_data.py defines the load function to load data from data/
-    (only when the files have the correct name style)
+    (only when the files have the correct name style), the create_views
+    function to (re)create the stations and connections from a graph, the
+    decode_lines function to rebuild encoded lines and the save_solution and
+    load_solution functions to save lines in a compact binary file
 
 authors:
     Dani van Enk, 11823526
@@ -10,7 +13,9 @@ authors:
 
 # used imports
 import csv
-from code.classes import Station, Connection
+import numpy as np
+
+from code.classes import Station, Connection, Graph, Line
 
 
 def load(stations_file, connections_file):
@@ -21,7 +26,8 @@ def load(stations_file, connections_file):
         stations_file    - path to the stations file;
         connections_file - path to the connections file;
 
-    returns stations dictionary and connection list
+    returns stations dictionary and connection list, the stations and
+        connections are views on the same Graph
     """
 
     # make sure stations file exists
@@ -50,10 +56,138 @@ def load(stations_file, connections_file):
     except FileNotFoundError:
         exit(f"{connections_file} not found")
 
-    # add stations and connections to database
-    stations = {name: Station(name, lat, long)
-                for name, lat, long in stations_reader}
-    connections = [Connection(stations[start], stations[end], duration)
-                   for start, end, duration in connections_reader]
+    # read all rows, so the graph can be built at once
+    station_rows = list(stations_reader)
+    connection_rows = list(connections_reader)
+
+    # make sure all connections are between known stations
+    station_ids = {row[0]: sid for sid, row in enumerate(station_rows)}
+    try:
+        starts = [station_ids[start] for start, _, _ in connection_rows]
+        ends = [station_ids[end] for _, end, _ in connection_rows]
+    except KeyError as error:
+        exit(f"{connections_file} contains unknown station {error}")
+
+    # build the array backed graph
+    graph = Graph([name for name, _, _ in station_rows],
+                  [lat for _, lat, _ in station_rows],
+                  [long for _, _, long in station_rows],
+                  starts, ends,
+                  [duration for _, _, duration in connection_rows])
+
+    return create_views(graph)
+
+
+def create_views(graph):
+    """
+    creates the stations and connections as views on a graph
+
+    parameter:
+        graph - graph to create the views on;
+
+    returns stations dictionary and connection list
+    """
+
+    # add stations and connections to database as views on the graph
+    stations = {name: Station(name, lat, long, graph)
+                for name, lat, long in zip(graph.names, graph.latitudes,
+                                           graph.longitudes)}
+    connections = [Connection(stations[graph.names[start]],
+                              stations[graph.names[end]], duration,
+                              graph, cid)
+                   for cid, (start, end, duration)
+                   in enumerate(zip(graph.starts, graph.ends,
+                                    graph.durations))]
 
     return stations, connections
+
+
+def decode_lines(codes, connections):
+    """
+    rebuilds lines from their encoded form (see Line.encode)
+
+    parameters:
+        codes       - start station id and connection ids for each line;
+        connections - connections in database;
+
+    returns list of lines
+    """
+
+    # find the station objects by their station id
+    stations = {station.sid: station for connection in connections
+                for station in connection.section}
+
+    # rebuild each line from its start station and connections
+    lines = []
+    for start, cids in codes:
+        try:
+            line = Line(stations[start] if start is not None else None)
+            for cid in cids:
+                assert line.add_connection(connections[cid], float("inf"))
+        except (KeyError, IndexError, AssertionError):
+            exit("DecodeError: encoded line does not fit the connections")
+
+        lines.append(line)
+
+    return lines
+
+
+def save_solution(lines, connections, solution_file):
+    """
+    saves lines in a compact binary file, the encoded lines (see Line.encode)
+        as integer arrays together with the fingerprint of the graph
+
+    parameters:
+        lines           - lines of the solution;
+        connections     - connections in database;
+        solution_file   - file to save the solution to;
+    """
+
+    # encode the lines as their start station id (-1 if empty), number of
+    #   connections and the connection ids of all lines after each other
+    codes = [line.encode() for line in lines]
+    starts = np.array([-1 if start is None else start
+                       for start, _ in codes], dtype=np.int32)
+    lengths = np.array([len(cids) for _, cids in codes], dtype=np.int32)
+    cids = np.fromiter((cid for _, line_cids in codes for cid in line_cids),
+                       dtype=np.int32, count=int(lengths.sum()))
+
+    # write to an open file, so numpy doesn't add the .npz extension
+    with open(solution_file, "wb") as file:
+        np.savez(file, fingerprint=connections[0].graph.fingerprint,
+                 starts=starts, lengths=lengths, cids=cids)
+
+
+def load_solution(solution_file, connections):
+    """
+    loads lines saved with save_solution
+
+    parameters:
+        solution_file   - file with the saved solution;
+        connections     - connections in database;
+
+    returns list of lines
+    """
+
+    # make sure the file is a saved solution
+    try:
+        with np.load(solution_file) as solution:
+            fingerprint = str(solution["fingerprint"])
+            starts = solution["starts"].tolist()
+            lengths = solution["lengths"]
+            cids = solution["cids"].tolist()
+    except (OSError, ValueError, KeyError):
+        exit(f"SolutionError: please make sure {solution_file} exists and "
+             "is a saved solution")
+
+    # make sure the solution is for the same stations and connections
+    if fingerprint != connections[0].graph.fingerprint:
+        exit(f"SolutionError: please make sure {solution_file} is a "
+             "solution for this area")
+
+    # split the connection ids per line and rebuild the lines
+    ends = np.cumsum(lengths).tolist()
+    codes = [(start if start >= 0 else None, cids[end - length:end])
+             for start, length, end in zip(starts, lengths.tolist(), ends)]
+
+    return decode_lines(codes, connections)
@@ -28,7 +28,8 @@ from PIL import ImageColor
 from collections import defaultdict
 
 
-def plot_map(stations, connections, lines, area, output_path="./output/plot/"):
+def plot_map(stations, connections, lines, area, output_path="./output/plot/",
+             rng=random):
     """
     Plot all the lines on a Map and save as png-file
 
@@ -38,6 +39,7 @@ def plot_map(stations, connections, lines, area, output_path="./output/plot/"):
         lines           - the lines that are plotted;
         area            - geographical area of lines;
         output_path     - folder where plot is saved;
+        rng             - random number generator for the line colors;
     """
 
     # Create Figure and Axe
@@ -87,11 +89,11 @@ def plot_map(stations, connections, lines, area, output_path="./output/plot/"):
     for line_number in range(len(lines)):
 
         # generate random color
-        color = random_color()
+        color = random_color(rng)
 
         # generate new color the contrast is high enough no double colors
         while (rgb(color, land_color) >= 10 and color not in used_colors):
-            color = random_color()
+            color = random_color(rng)
 
         # add color to used color
         used_colors.append(color)
@@ -285,9 +287,12 @@ def aspect_ratio(latitude_list):
     return 1/math.cos(math.radians(middle_long))
 
 
-def random_color():
+def random_color(rng=random):
     """
     Return random RGB-values to make color.
+
+    parameter:
+        rng - random number generator to use (default random module);
     """
 
-    return (random.random(), random.random(), random.random())
+    return (rng.random(), rng.random(), rng.random())
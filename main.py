@@ -12,11 +12,16 @@ authors:
 # used imports
 import sys
 import csv
+import random
+import pstats
+import cProfile
+import tracemalloc
 import matplotlib.pyplot as plt
 
-from code.data_loader.load_data import load
+from code.data_loader.load_data import load, save_solution
 from code.algorithms import Random_Connections, Greedy, Hill_Climber, \
-                            Simulated_Annealing
+                            Simulated_Annealing, Multi_Start, \
+                            Parallel_Tempering
 from code.visualization.plot_lines import plot_map
 from code.classes import Arg
 
@@ -37,39 +42,76 @@ def main(argv):
                      argument_type="int"),
                  Arg(("-i", "--iterations"), "No. of iterations per run", True,
                      "int"),
-                 Arg(("-A", "--algorithm"), "Algorithm to run")]
+                 Arg(("-A", "--algorithm"), "Algorithm to run"),
+                 Arg(("-w", "--workers"), "No. of parallel worker processes",
+                     True, "int"),
+                 Arg(("-e", "--every"), "Keep every n-th score in memory",
+                     True, "int"),
+                 Arg(("-s", "--stream"), "CSV file to stream all scores to",
+                     True),
+                 Arg(("-S", "--seed"), "Seed to reproduce a run", True,
+                     "int"),
+                 Arg(("-P", "--profile"), "Write a profile of the run",
+                     True, "flag"),
+                 Arg(("-c", "--cooling"), "Cooling schedule of simulated "
+                     "annealing", True),
+                 Arg(("-T", "--temperature"), "Start temperature of "
+                     "simulated annealing", True, "float"),
+                 Arg(("-R", "--reheats"), "No. of reheats of a stagnating "
+                     "run", True, "int"),
+                 Arg(("-n", "--stagnation"), "No. of iterations without "
+                     "improvement to reheat/stop", True, "int"),
+                 Arg(("-C", "--chains"), "No. of chains of parallel "
+                     "tempering", True, "int"),
+                 Arg(("-t", "--time-limit"), "Max no. of seconds to run",
+                     True, "float"),
+                 Arg(("-k", "--checkpoint"), "File to save checkpoints of "
+                     "a local search to", True),
+                 Arg(("-u", "--resume"), "Continue from the checkpoint",
+                     True, "flag"),
+                 Arg(("-I", "--start"), "Start of a local search, random, "
+                     "greedy or a solution file", True),
+                 Arg(("-b", "--best-of"), "No. of runs to take the best "
+                     "start from", True, "int"),
+                 Arg(("-p", "--paths"), "File to cache the shortest paths "
+                     "of a local search in", True)]
 
     # print help function if help parameters are present or no arguments given
     if len(argv) == 0 or "-h" in argv or "--help" in argv:
         print_help(arguments)
 
-    # create empty set for argument options
-    argument_options = ()
-
-    # add all argument aliases to argument_options
-    for argument in arguments:
-        argument_options += argument.aliases
+    # find the argument of each alias
+    argument_options = {alias: argument for argument in arguments
+                        for alias in argument.aliases}
 
     # predefine user_input dictionary
     user_input = dict()
 
-    # go over each argument
-    for arg in arguments:
+    # go over each given argument
+    index = 0
+    while index < len(argv):
+
+        # print help function if the option is unknown
+        if argv[index] not in argument_options:
+            print_help(arguments)
+        arg = argument_options[argv[index]]
 
-        # find the corresponding given values
-        for index in range(0, len(argv) - 1, 2):
+        # flags take no value
+        if arg.argument_type == "flag":
+            arg.value = True
+            index += 1
 
-            # add to user_input if value is not argument_flag
-            if argv[index] in arg.aliases and \
-                    argv[index + 1] not in argument_options:
-                try:
-                    arg.value = argv[index + 1]
-                    user_input[arg.name] = arg.value
-                except IndexError:
-                    pass
-            # if value is argument flag print help function
-            elif argv[index + 1] in argument_options:
-                print_help(arguments)
+        # add value to user_input if value is not an argument flag
+        elif index + 1 < len(argv) and \
+                argv[index + 1] not in argument_options:
+            arg.value = argv[index + 1]
+            index += 2
+
+        # if value is missing print help function
+        else:
+            print_help(arguments)
+
+        user_input[arg.name] = arg.value
 
     # get stations/connections file paths
     stations_file = f"data/Stations{user_input['area']}.csv"
@@ -78,14 +120,20 @@ def main(argv):
     # load stations and connections
     stations, connections = load(stations_file, connections_file)
 
-    # create lines according to user parameters
-    lines, score, scores = create_lines(connections, **user_input)
+    # create lines according to user parameters, profiled if asked for
+    if user_input.get("profile"):
+        lines, score, scores, stats = profile(create_lines, connections,
+                                              **user_input)
+    else:
+        lines, score, scores, stats = create_lines(connections,
+                                                   **user_input)
 
-    # plot the resulting line map
-    plot_map(stations, connections, lines, user_input['area'])
+    # plot the resulting line map, the colors follow the seed as well
+    plot_map(stations, connections, lines, user_input['area'],
+             rng=random.Random(user_input.get("seed")))
 
     # generate the output file and plot scores
-    output(lines, score, scores, user_input["algorithm"])
+    output(lines, score, scores, stats, user_input["algorithm"], connections)
 
 
 def print_help(arguments):
@@ -120,15 +168,54 @@ def print_help(arguments):
     exit()
 
 
-def output(lines, score, scores, algorithm):
+def profile(function, *args, output_file="output/profile.txt", **kwargs):
+    """
+    runs a function with cProfile and tracemalloc and writes the report,
+        only the main process is profiled when workers are used
+
+    parameters:
+        function    - function to profile;
+        args        - arguments of the function;
+        output_file - file to write the report to
+            (default output/profile.txt);
+        kwargs      - keyword arguments of the function;
+
+    returns the result of the function
+    """
+
+    # run the function while profiling time and memory
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    result = function(*args, **kwargs)
+    profiler.disable()
+    peak = tracemalloc.get_traced_memory()[1]
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # write the peak memory, slowest functions and largest allocations
+    with open(output_file, "w") as report:
+        report.write(f"peak memory {peak / 2**20:.2f} MB\n\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative") \
+            .print_stats(30)
+        report.write("largest allocations\n")
+        for statistic in snapshot.statistics("lineno")[:10]:
+            report.write(f"{statistic}\n")
+
+    return result
+
+
+def output(lines, score, scores, stats, algorithm, connections):
     """
-    generate output file and plot scores
+    generate output file, solution file, operator stats and plot scores
 
     parameters:
         lines       - lines for optimal solution;
         score       - best score for the lines;
         scores      - dictionary of all scores generated by the algorithm runs;
+        stats       - operator stats of the algorithm;
         algorithm   - algorithm used;
+        connections - connections in dataset;
     """
 
     # create an output file
@@ -146,6 +233,13 @@ def output(lines, score, scores, algorithm):
     # add score
     output_writer.writerow(["score", score])
 
+    # save the solution in a compact form that can be loaded again
+    save_solution(lines, connections, "output/solution.bin")
+
+    # write the calls, acceptance, time and score change per operator
+    if stats:
+        stats.write("output/moves.csv")
+
     # plot scores in histogram
     plt.figure()
     for n_of_l in scores:
@@ -177,11 +271,94 @@ def create_lines(connections, **kwargs):
     # define all algorithm options
     algorithms = {"random": Random_Connections, "greedy": Greedy,
                   "hill_climber": Hill_Climber,
-                  "simulated_annealing": Simulated_Annealing}
-
-    # run the specified algorithm
-    algorithm = algorithms[kwargs["algorithm"].lower()](
-        connections, kwargs["duration"], kwargs["lines"])
+                  "simulated_annealing": Simulated_Annealing,
+                  "parallel_tempering": Parallel_Tempering}
+
+    # define the options for the score history, random seed and time limit
+    options = {"history_every": kwargs.get("every", 1),
+               "history_file": kwargs.get("stream"),
+               "seed": kwargs.get("seed"),
+               "time_limit": kwargs.get("time-limit")}
+
+    # define the options of simulated annealing
+    if kwargs["algorithm"].lower() == "simulated_annealing":
+        annealing_options = {"cooling": "schedule",
+                             "temperature": "start_temperature",
+                             "reheats": "reheats",
+                             "stagnation": "stagnation"}
+        options.update({option: kwargs[name] for name, option
+                        in annealing_options.items() if name in kwargs})
+
+    # define the options of parallel tempering, it uses the workers itself
+    if kwargs["algorithm"].lower() == "parallel_tempering":
+        tempering_options = {"temperature": "max_temperature",
+                             "chains": "chains", "workers": "workers"}
+        options.update({option: kwargs.pop(name) for name, option
+                        in tempering_options.items() if name in kwargs})
+
+    # start a local search from the best of random/greedy runs or from a
+    #   saved solution
+    if kwargs["algorithm"].lower() in ["hill_climber",
+                                       "simulated_annealing"]:
+        options.update(start=kwargs.get("start", "random"),
+                       start_runs=kwargs.get("best-of", 1))
+
+        # spread many greedy runs over the workers first, the best is
+        #   shared with the local searches as a saved solution
+        if options["start"] == "greedy" and options["start_runs"] > 1 and \
+                "workers" in kwargs:
+            start_lines = Multi_Start(Greedy, connections, kwargs["duration"],
+                                      kwargs["lines"], kwargs["workers"],
+                                      seed=kwargs.get("seed")) \
+                .run(options["start_runs"], progress_bar=False)[0][0]
+            save_solution(start_lines, connections, "output/start.bin")
+            options["start"] = "output/start.bin"
+
+    # cache the shortest paths of a local search, parallel tempering runs
+    #   simulated annealing
+    if "paths" in kwargs:
+        if kwargs["algorithm"].lower() not in ["hill_climber",
+                                               "simulated_annealing",
+                                               "parallel_tempering"]:
+            exit("make sure the shortest paths are only cached for "
+                 "hill_climber, simulated_annealing and parallel_tempering")
+
+        options["paths_file"] = kwargs["paths"]
+
+    # save checkpoints of a local search, a resumed run keeps saving them
+    if "checkpoint" in kwargs or "resume" in kwargs:
+        if kwargs["algorithm"].lower() not in ["hill_climber",
+                                               "simulated_annealing"] or \
+                "workers" in kwargs:
+            exit("make sure checkpoints are only used for hill_climber and "
+                 "simulated_annealing without workers")
+
+        options["checkpoint_file"] = kwargs.setdefault(
+            "checkpoint", "output/checkpoint.pkl")
+
+        # a resumed run streams on to the csv file of the checkpoint,
+        #   opening it here would empty it
+        if kwargs.get("resume"):
+            options["history_file"] = None
+
+    # run the specified algorithm, spread over workers if specified
+    if "workers" in kwargs.keys():
+        algorithm = Multi_Start(algorithms[kwargs["algorithm"].lower()],
+                                connections, kwargs["duration"],
+                                kwargs["lines"], kwargs["workers"], **options)
+    else:
+        algorithm = algorithms[kwargs["algorithm"].lower()](
+            connections, kwargs["duration"], kwargs["lines"], **options)
+
+    # continue from the last checkpoint
+    if kwargs.get("resume"):
+        algorithm.load_checkpoint(kwargs["checkpoint"])
+
+    # local searches with a time limit run until the time is up, unless
+    #   the iterations are specified
+    if "time-limit" in kwargs and kwargs["algorithm"].lower() in \
+            ["hill_climber", "simulated_annealing", "parallel_tempering"]:
+        kwargs.setdefault("iterations", None)
 
     # if iteration is specified run multiple
     try:
@@ -189,8 +366,10 @@ def create_lines(connections, **kwargs):
     except KeyError:
         lines, K, p = algorithm.run(kwargs["repeat"])[0]
 
-    # get score
+    # get score and operator stats, all scores are streamed by now
     scores = algorithm.scores
+    scores.close()
+    stats = algorithm.stats
 
     # print stations/duration/score/coverage of solution
     for line in lines:
@@ -200,7 +379,7 @@ def create_lines(connections, **kwargs):
     print(f"sections traversed {p*len(connections):.0f}/"
           f"{len(connections):.0f}")
 
-    return lines, K, scores
+    return lines, K, scores, stats
 
 
 # if name is main run main()